@@ -0,0 +1,80 @@
+"""Compare one spawn per sensor with running all sensors' commands as a batch.
+
+Usage: python benchmarks/bench_batch.py [--sensors N] [--rounds N] [--command CMD]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import statistics
+import sys
+import time
+import types
+from pathlib import Path
+
+COMPONENT = Path(__file__).resolve().parent.parent / "custom_components" / "run_command"
+MAX_OUTPUT = 1024 * 1024
+TIMEOUT = 10
+
+
+def load_batch():
+    """Load batch.py (and its helpers) without importing Home Assistant."""
+    package = types.ModuleType("run_command_bench")
+    package.__path__ = [str(COMPONENT)]
+    sys.modules[package.__name__] = package
+    return importlib.import_module(f"{package.__name__}.batch")
+
+
+async def run_spawn(command: str, sensors: int) -> float:
+    """Spawn one shell per sensor, like the default shell mode."""
+
+    async def spawn() -> None:
+        proc = await asyncio.create_subprocess_shell(
+            command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        await proc.communicate()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(spawn() for _ in range(sensors)))
+    return time.perf_counter() - start
+
+
+async def run_batch(batch, command: str, sensors: int) -> float:
+    """Run every sensor's command in a single batch shell."""
+    commands = [batch.BatchCommand(command, TIMEOUT, MAX_OUTPUT)] * sensors
+    start = time.perf_counter()
+    results = await batch.async_run_batch(commands, lambda proc: lambda: None)
+    elapsed = time.perf_counter() - start
+    assert all(result is not None and result.returncode == 0 for result in results)
+    return elapsed
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sensors", type=int, default=30)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--command", default="cat /proc/loadavg")
+    args = parser.parse_args()
+    batch = load_batch()
+
+    print(f"command: {args.command!r}, sensors: {args.sensors}, rounds: {args.rounds}")
+    results = {}
+    for name in ("spawn", "batch"):
+        samples = []
+        for _ in range(args.rounds):
+            if name == "spawn":
+                elapsed = await run_spawn(args.command, args.sensors)
+            else:
+                elapsed = await run_batch(batch, args.command, args.sensors)
+            samples.append(elapsed * 1000)
+        results[name] = statistics.median(samples)
+        print(f"{name:>6}: median {results[name]:.2f} ms per round")
+    print(f" saved: {results['spawn'] - results['batch']:.2f} ms per round (median)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""Compare spawn latency of shell execution with shell-free argv execution.
+
+Usage: python benchmarks/bench_exec_mode.py [--polls N] [--command CMD]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import shlex
+import statistics
+import time
+
+
+async def spawn_shell(command: str) -> None:
+    """Run the command through /bin/sh like the default shell mode."""
+    proc = await asyncio.create_subprocess_shell(
+        command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    await proc.communicate()
+
+
+async def spawn_exec(command: str) -> None:
+    """Run the command directly from its argv like exec mode."""
+    proc = await asyncio.create_subprocess_exec(
+        *shlex.split(command),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    await proc.communicate()
+
+
+async def measure(runner, command: str, polls: int) -> list[float]:
+    """Return the latency of each run in milliseconds."""
+    samples = []
+    for _ in range(polls):
+        start = time.perf_counter()
+        await runner(command)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--polls", type=int, default=500)
+    parser.add_argument("--command", default="cat /proc/loadavg")
+    args = parser.parse_args()
+
+    print(f"command: {args.command!r}, polls: {args.polls}")
+    results = {}
+    for name, runner in (("shell", spawn_shell), ("exec", spawn_exec)):
+        samples = await measure(runner, args.command, args.polls)
+        results[name] = statistics.median(samples)
+        print(
+            f"{name:>6}: median {results[name]:.3f} ms, "
+            f"p95 {statistics.quantiles(samples, n=20)[-1]:.3f} ms"
+        )
+    print(f" saved: {results['shell'] - results['exec']:.3f} ms per run (median)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
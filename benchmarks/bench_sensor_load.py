@@ -0,0 +1,180 @@
+"""Load-test the sensor update path with many Run Command sensors.
+
+Creates N sensors from synthetic config entries on an in-process Home
+Assistant instance and drives ``async_update`` on each of them at the scan
+interval. Reports polls/s, event loop lag, RSS and open file descriptors.
+Requires Home Assistant to be installed (``pip install homeassistant``).
+
+Usage: python benchmarks/bench_sensor_load.py [--sensors N] [--profile NAME]
+       [--duration S] [--interval S] [--mode MODE] [--shared]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.run_command.const import (  # noqa: E402
+    CONF_COMMAND,
+    CONF_EXECUTION_MODE,
+    CONF_NAME,
+    CONF_SCAN_INTERVAL,
+    CONF_TIMEOUT,
+    CONF_VALUE_TEMPLATE,
+    DATA_STATS,
+    DOMAIN,
+    EXECUTION_MODES,
+)
+from custom_components.run_command.executor import async_get_executor  # noqa: E402
+from custom_components.run_command.sensor import RunCommandSensor  # noqa: E402
+from custom_components.run_command.telemetry import CommandStats  # noqa: E402
+
+# {i}는 센서 번호로 바뀌므로 --shared 없이는 센서마다 다른 명령어가 됨
+PROFILES = {
+    "fast": {CONF_COMMAND: "echo {i}"},
+    "slow": {CONF_COMMAND: "sleep 0.5; echo {i}"},
+    "json": {
+        CONF_COMMAND: 'printf \'{{"id": {i}, "values": [%s]}}\' "$(seq -s, 1 20000)"',
+        CONF_VALUE_TEMPLATE: "{{ value_json['values'] | length }}",
+    },
+    "failing": {CONF_COMMAND: "echo failed {i} >&2; exit 1"},
+    "timeout": {CONF_COMMAND: "sleep 30; echo {i}", CONF_TIMEOUT: 1},
+}
+
+LAG_PROBE_INTERVAL = 0.05
+
+
+def read_rss_kib() -> int | None:
+    """Return the resident set size of this process in KiB."""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def count_fds() -> int | None:
+    """Return the number of open file descriptors of this process."""
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+async def probe_loop_lag(samples: list[float], stop: asyncio.Event) -> None:
+    """Measure how late the event loop wakes up a sleeping task."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        samples.append((time.perf_counter() - start - LAG_PROBE_INTERVAL) * 1000)
+
+
+async def drive_sensor(
+    sensor: RunCommandSensor, interval: float, deadline: float
+) -> None:
+    """Update the sensor every interval until the deadline."""
+    while (start := time.monotonic()) < deadline:
+        await sensor.async_update()
+        await asyncio.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+
+def make_config(profile: str, index: int, args: argparse.Namespace) -> dict:
+    """Return a synthetic config entry's data for one sensor."""
+    config = {
+        CONF_NAME: f"Bench {index}",
+        CONF_SCAN_INTERVAL: args.interval,
+        CONF_TIMEOUT: 10,
+        CONF_EXECUTION_MODE: args.mode,
+        **PROFILES[profile],
+    }
+    config[CONF_COMMAND] = config[CONF_COMMAND].format(i=0 if args.shared else index)
+    return config
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sensors", type=int, default=50)
+    parser.add_argument("--profile", choices=PROFILES, default="fast")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--interval", type=float, default=1)
+    parser.add_argument("--mode", choices=EXECUTION_MODES, default="shell")
+    parser.add_argument(
+        "--shared", action="store_true", help="give every sensor the same command"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        stats_by_entry: dict[str, CommandStats] = hass.data.setdefault(
+            DOMAIN, {}
+        ).setdefault(DATA_STATS, {})
+
+        sensors = []
+        for index in range(args.sensors):
+            entry_id = f"bench{index:05d}"
+            stats_by_entry[entry_id] = CommandStats()
+            sensor = RunCommandSensor(hass, entry_id, make_config(args.profile, index, args))
+            sensor.entity_id = f"sensor.bench_{index}"
+            sensors.append(sensor)
+
+        rss_before, fds_before = read_rss_kib(), count_fds()
+        lag: list[float] = []
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(probe_loop_lag(lag, stop))
+
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(drive_sensor(sensor, args.interval, deadline) for sensor in sensors)
+        )
+        elapsed = time.monotonic() - started
+        rss_after, fds_after = read_rss_kib(), count_fds()
+        stop.set()
+        await lag_task
+
+        stats = list(stats_by_entry.values())
+        polls = sum(entry.runs for entry in stats)
+        durations = sorted(d * 1000 for entry in stats for d in entry.durations)
+        lag.sort()
+
+        print(
+            f"profile: {args.profile}, sensors: {args.sensors}, mode: {args.mode}, "
+            f"interval: {args.interval}s, shared: {args.shared}"
+        )
+        print(f"     polls: {polls} in {elapsed:.1f}s ({polls / elapsed:.1f} polls/s)")
+        print(
+            f"  failures: {sum(entry.failures for entry in stats)}, "
+            f"timeouts: {sum(entry.timeouts for entry in stats)}"
+        )
+        if durations:
+            print(
+                f"  duration: median {statistics.median(durations):.1f} ms, "
+                f"p95 {durations[int(len(durations) * 0.95) - 1]:.1f} ms"
+            )
+        if lag:
+            print(
+                f"  loop lag: median {statistics.median(lag):.2f} ms, "
+                f"p95 {lag[int(len(lag) * 0.95) - 1]:.2f} ms, max {lag[-1]:.2f} ms"
+            )
+        print(f"       rss: {rss_before} -> {rss_after} KiB")
+        print(f"  open fds: {fds_before} -> {fds_after}")
+
+        await async_get_executor(hass).async_shutdown()
+        await hass.async_stop(force=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
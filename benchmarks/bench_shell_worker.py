@@ -0,0 +1,69 @@
+"""Compare spawn-per-update execution with a persistent shell worker.
+
+Usage: python benchmarks/bench_shell_worker.py [--polls N] [--command CMD]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import time
+from pathlib import Path
+
+COMPONENT = Path(__file__).resolve().parent.parent / "custom_components" / "run_command"
+MAX_OUTPUT = 1024 * 1024
+
+
+def load_shell_worker():
+    """Load shell_worker.py without importing Home Assistant."""
+    spec = importlib.util.spec_from_file_location(
+        "shell_worker", COMPONENT / "shell_worker.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def run_spawn(command: str, polls: int) -> float:
+    """Run the command the way the default shell mode does."""
+    start = time.perf_counter()
+    for _ in range(polls):
+        proc = await asyncio.create_subprocess_shell(
+            command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        await proc.communicate()
+    return time.perf_counter() - start
+
+
+async def run_worker(command: str, polls: int) -> float:
+    """Run the command on a single persistent shell worker."""
+    worker = load_shell_worker().ShellWorker()
+    await worker.async_run("true", 10, MAX_OUTPUT)  # 시작 비용 제외
+    start = time.perf_counter()
+    for _ in range(polls):
+        await worker.async_run(command, 10, MAX_OUTPUT)
+    elapsed = time.perf_counter() - start
+    worker.close()
+    return elapsed
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--polls", type=int, default=500)
+    parser.add_argument("--command", default="cat /proc/loadavg")
+    args = parser.parse_args()
+
+    print(f"command: {args.command!r}, polls: {args.polls}")
+    for name, runner in (("spawn", run_spawn), ("persistent", run_worker)):
+        elapsed = await runner(args.command, args.polls)
+        print(
+            f"{name:>10}: {args.polls / elapsed:8.1f} polls/s "
+            f"({elapsed / args.polls * 1000:.2f} ms/poll)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
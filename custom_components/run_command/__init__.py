@@ -1,33 +1,184 @@
 """The Run Command integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import replace
 from datetime import timedelta
 from typing import Any
 
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    EVENT_HOMEASSISTANT_STOP,
+    Platform,
+)
+from homeassistant.core import (
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import (
+    HomeAssistantError,
+    ServiceValidationError,
+    TemplateError,
+    Unauthorized,
+)
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.template import Template
 from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
+from .const import (
+    ATTR_ENTRY_ID,
+    CONF_COMMAND,
+    CONF_MAX_CONCURRENCY,
+    CONF_MAX_OUTPUT_SIZE,
+    CONF_TIMEOUT,
+    DATA_EXECUTOR,
+    DATA_REFRESH,
+    DATA_STARTUP,
+    DATA_STATS,
+    DEFAULT_MAX_CONCURRENCY,
+    DOMAIN,
+    MAX_TIMEOUT,
+    SERVICE_EXECUTE,
+)
+from .executor import CommandOptions, async_get_executor
+from .output_cache import async_remove_output_cache
+from .telemetry import CommandStats
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+CONFIG_SCHEMA = vol.Schema(
+    {
+        DOMAIN: vol.Schema(
+            {
+                vol.Optional(
+                    CONF_MAX_CONCURRENCY, default=DEFAULT_MAX_CONCURRENCY
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+SERVICE_EXECUTE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Exclusive(CONF_COMMAND, "target"): cv.template,
+            vol.Exclusive(ATTR_ENTRY_ID, "target"): cv.string,
+            vol.Optional(CONF_TIMEOUT): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=MAX_TIMEOUT)
+            ),
+            vol.Optional(CONF_MAX_OUTPUT_SIZE): vol.All(
+                vol.Coerce(int), vol.Range(min=1)
+            ),
+        }
+    ),
+    cv.has_at_least_one_key(CONF_COMMAND, ATTR_ENTRY_ID),
+)
+
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Run Command integration."""
+    conf = config.get(DOMAIN, {})
+
+    # 통합 전체에서 동시에 실행할 수 있는 명령어 수 제한
+    executor = async_get_executor(hass)
+    executor.limiter.limit = conf.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY)
+
+    async def _async_shutdown(event: Event) -> None:
+        """Kill commands that are still running when Home Assistant stops."""
+        await executor.async_shutdown()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_shutdown)
+
+    async def _async_execute(call: ServiceCall) -> ServiceResponse:
+        """Run a command, or refresh an entry, and return its output."""
+        return await _async_handle_execute(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXECUTE,
+        _async_execute,
+        schema=SERVICE_EXECUTE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
     return True
 
 
+async def _async_handle_execute(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Handle the execute service.
+
+    A ``command`` is rendered and run with the given limits (or the
+    defaults). An ``entry_id`` runs that entry's command with its own
+    options while its sensors refresh through their own update path (an
+    update already in progress is not repeated); both share a single
+    execution.
+    Identical concurrent calls are coalesced by the shared executor.
+    """
+    # 임의의 셸 명령어를 실행하므로 관리자만 호출 가능
+    if call.context.user_id:
+        user = await hass.auth.async_get_user(call.context.user_id)
+        if user is None or not user.is_admin:
+            raise Unauthorized(context=call.context)
+
+    refresh: Callable[[], Awaitable[None]] | None = None
+    if ATTR_ENTRY_ID in call.data:
+        entry_id = call.data[ATTR_ENTRY_ID]
+        entry = hass.config_entries.async_get_entry(entry_id)
+        if entry is None or entry.domain != DOMAIN or entry_id not in hass.data[DOMAIN]:
+            raise ServiceValidationError(f"Run Command 항목을 찾을 수 없습니다: {entry_id}")
+        config = hass.data[DOMAIN][entry_id]
+        template = Template(config[CONF_COMMAND], hass)
+        options = CommandOptions.from_config(config)
+        # 센서의 업데이트 경로를 거쳐야 진행 중인 업데이트와 겹치지 않음
+        refresh = hass.data[DOMAIN].get(DATA_REFRESH, {}).get(entry_id)
+    else:
+        template = call.data[CONF_COMMAND]
+        template.hass = hass
+        options = CommandOptions()
+
+    if CONF_TIMEOUT in call.data:
+        options = replace(options, timeout=call.data[CONF_TIMEOUT])
+    if CONF_MAX_OUTPUT_SIZE in call.data:
+        options = replace(options, max_output=call.data[CONF_MAX_OUTPUT_SIZE] * 1024)
+
+    try:
+        command = template.async_render(parse_result=False)
+    except TemplateError as err:
+        raise HomeAssistantError(f"명령어 템플릿 오류: {err}") from err
+
+    started = time.monotonic()
+    run = async_get_executor(hass).async_run(command, options)
+    if refresh is not None:
+        # 센서 업데이트가 같은 명령어를 요청하면 실행기에서 한 번만 실행됨
+        result, _ = await asyncio.gather(run, refresh())
+    else:
+        result = await run
+
+    return {
+        "stdout": result.stdout.decode(errors="replace"),
+        "stderr": result.stderr.decode(errors="replace"),
+        "returncode": result.returncode,
+        "timed_out": result.timed_out,
+        "truncated": result.truncated,
+        "duration": round(time.monotonic() - started, 3),
+    }
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Run Command from a config entry."""
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = entry.data
+    hass.data[DOMAIN].setdefault(DATA_STATS, {})[entry.entry_id] = CommandStats()
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
@@ -47,5 +198,21 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DOMAIN][DATA_STATS].pop(entry.entry_id, None)
+
+        # 마지막 엔트리가 제거되면 공유 실행기 정리 (설정은 유지)
+        if set(hass.data[DOMAIN]) <= {
+            DATA_EXECUTOR,
+            DATA_REFRESH,
+            DATA_STARTUP,
+            DATA_STATS,
+        }:
+            if executor := hass.data[DOMAIN].get(DATA_EXECUTOR):
+                await executor.async_shutdown()
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the stored last output of a removed entry."""
+    await async_remove_output_cache(hass, entry.entry_id)
@@ -0,0 +1,96 @@
+"""Failure backoff and adaptive polling for Run Command integration."""
+from __future__ import annotations
+
+import time
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class PollBackoff:
+    """Decide which scheduled polls of a sensor should actually run.
+
+    After each consecutive failure the next poll is delayed by twice as many
+    intervals, up to ``max_delay``. Once ``threshold`` failures in a row are
+    reached the circuit opens: nothing runs for ``open_time``, then a single
+    probe is let through (half-open). A successful run closes the circuit.
+
+    With ``adaptive`` set, the interval is also doubled (up to
+    ``max_factor`` times) for every ``stable_polls`` runs in a row with
+    unchanged output, and snaps back as soon as the output changes. Runs
+    triggered by a changed input rather than the timer are only held back
+    by failures, not by the adaptive interval.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        threshold: int,
+        max_delay: float,
+        open_time: float,
+        adaptive: bool = False,
+        stable_polls: int = 3,
+        max_factor: int = 8,
+    ) -> None:
+        """Initialize the backoff."""
+        self.interval = interval
+        self.threshold = threshold
+        self.max_delay = max_delay
+        self.open_time = open_time
+        self.adaptive = adaptive
+        self.stable_polls = stable_polls
+        self.max_factor = max_factor
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.stable = 0
+        self.factor = 1
+        self._next_attempt = 0.0
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds until the next poll may run."""
+        return max(0.0, self._next_attempt - time.monotonic())
+
+    def allow(self, triggered: bool = False) -> bool:
+        """Return True if a scheduled (or ``triggered``) run may start now."""
+        if time.monotonic() < self._next_attempt and not (
+            triggered and not self.failures
+        ):
+            return False
+        if self.state == CIRCUIT_OPEN:
+            self.state = CIRCUIT_HALF_OPEN
+        return True
+
+    def record(self, failed: bool, changed: bool) -> None:
+        """Record the outcome of a run and plan the next one."""
+        if failed:
+            self.failures += 1
+            self.stable = 0
+            self.factor = 1
+            if not self.threshold:
+                return
+            if self.failures >= self.threshold:
+                self.state = CIRCUIT_OPEN
+                self._delay(self.open_time)
+            else:
+                self._delay(min(self.interval * 2**self.failures, self.max_delay))
+            return
+
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        if not self.adaptive:
+            self._next_attempt = 0.0
+            return
+
+        self.stable = 0 if changed else self.stable + 1
+        self.factor = min(2 ** (self.stable // self.stable_polls), self.max_factor)
+        self._delay(self.interval * self.factor)
+
+    def _delay(self, delay: float) -> None:
+        """Skip polls for the given delay.
+
+        Polls are ticks of a fixed timer, so half an interval of slack lets
+        the tick that falls on the deadline run.
+        """
+        self._next_attempt = time.monotonic() + delay - self.interval / 2
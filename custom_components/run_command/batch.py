@@ -0,0 +1,280 @@
+"""Batched command execution for Run Command integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import shlex
+import shutil
+import signal
+import tempfile
+from collections.abc import Callable, Sequence
+from typing import NamedTuple
+
+from .const import KILL_GRACE_TIME
+from .process import async_read_head, async_read_tail, signal_group
+from .shell_worker import SHELL, STDERR_TAIL_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+# 명령어별 시간 제한 외에 배치 전체에 더 주는 여유 시간 (초)
+BATCH_TIMEOUT_SLACK = 5
+# 셸이 끝난 뒤 출력을 마저 읽을 최대 시간 (그룹 밖의 프로세스가 파이프를 잡고 있는 경우)
+OUTPUT_DRAIN_TIME = 1
+# 명령어마다 새 세션(프로세스 그룹)에서 실행하는 도구 (없으면 서브셸의 PID만 종료 가능)
+SETSID = shutil.which("setsid")
+
+
+class BatchCommand(NamedTuple):
+    """One command of a batch."""
+
+    command: str
+    timeout: float
+    max_output: int
+    kill_on_overflow: bool = False
+
+
+class BatchResult(NamedTuple):
+    """Output of one command of a batch."""
+
+    stdout: bytes
+    stderr: bytes
+    returncode: int | None
+    timed_out: bool
+    stdout_size: int
+    stderr_size: int
+
+
+def build_script(directory: str, commands: Sequence[BatchCommand]) -> str:
+    """Return a shell script running ``commands`` side by side.
+
+    Each command runs in its own shell with stdout and stderr redirected to
+    named pipes in ``directory``, so a slow or noisy command cannot hold up
+    the output of the others. With ``setsid`` available that shell leads a
+    session of its own, so its PID is also the ID of a process group that
+    holds everything the command starts; otherwise it is a subshell. The
+    script reports ``<index> <pid>`` on stderr as each command starts and
+    ``<index> <exit code>`` on stdout as each one is waited for.
+    """
+    lines = []
+    for index, item in enumerate(commands):
+        stdout_path = shlex.quote(os.path.join(directory, f"{index}.out"))
+        stderr_path = shlex.quote(os.path.join(directory, f"{index}.err"))
+        # 백그라운드 작업은 그룹 리더가 아니므로 setsid가 fork 없이 바로 새 세션을 만듦
+        runner = (
+            f"{shlex.quote(SETSID)} {SHELL} -c {shlex.quote(item.command)}"
+            if SETSID
+            else f"( eval {shlex.quote(item.command)} )"
+        )
+        lines.append(
+            f"{runner} </dev/null"
+            f" >{stdout_path} 2>{stderr_path} & p{index}=$!;"
+            f' echo "{index} $p{index}" >&2'
+        )
+    for index in range(len(commands)):
+        lines.append(f'wait $p{index}; echo "{index} $?"')
+    return "\n".join(lines) + "\n"
+
+
+def _make_fifos(count: int) -> str:
+    """Create a private directory with a stdout and a stderr pipe per command."""
+    directory = tempfile.mkdtemp("", "run_command_")
+    for index in range(count):
+        os.mkfifo(os.path.join(directory, f"{index}.out"), 0o600)
+        os.mkfifo(os.path.join(directory, f"{index}.err"), 0o600)
+    return directory
+
+
+async def async_run_batch(
+    commands: Sequence[BatchCommand],
+    register_process: Callable[[asyncio.subprocess.Process], Callable[[], None]],
+) -> list[BatchResult | None]:
+    """Run ``commands`` in a single shell and return their results.
+
+    Output is read from the named pipes while the commands run, keeping
+    the first ``max_output`` bytes of stdout and the tail of stderr like a
+    spawned command, so nothing is written to disk. A command that passes
+    its output limit is killed with its process group if it has
+    ``kill_on_overflow`` set, and its stdout pipe is closed so programs
+    that left the group stop as well.
+
+    A command that exceeds its own timeout gets SIGTERM for its process
+    group, then SIGKILL after ``KILL_GRACE_TIME``, without affecting the
+    rest of the batch, and is reported as timed out; a command whose
+    result is missing gets None. Raises asyncio.TimeoutError after killing
+    the shell if the batch as a whole does not finish within the longest
+    command timeout plus a margin. Processes left behind by the commands
+    are killed with their process groups once the results are in.
+    """
+    loop = asyncio.get_running_loop()
+    directory = await loop.run_in_executor(None, _make_fifos, len(commands))
+    pids: dict[int, int] = {}
+    returncodes: dict[int, int] = {}
+    killed: set[int] = set()
+    overflowed: set[int] = set()
+    timers: list[asyncio.TimerHandle] = []
+    # 명령어가 파이프를 열기 전에 EOF로 읽히지 않도록 쓰기 쪽도 열어 둠
+    keepalive: list[int] = []
+    transports: list[asyncio.BaseTransport] = []
+    stdout_transports: dict[int, asyncio.BaseTransport] = {}
+    outputs: list[asyncio.Task[tuple[tuple[bytes, int], tuple[bytes, int]]]] = []
+
+    def _signal(pid: int, sig: int) -> bool:
+        """Signal one command's process group (or its subshell without setsid)."""
+        try:
+            if SETSID:
+                os.killpg(pid, sig)
+            else:
+                os.kill(pid, sig)
+        except (ProcessLookupError, PermissionError):
+            return False
+        return True
+
+    def _kill(index: int) -> None:
+        """Terminate a command that is still running after its timeout."""
+        if index not in returncodes and _signal(pids[index], signal.SIGTERM):
+            killed.add(index)
+            timers.append(
+                loop.call_later(KILL_GRACE_TIME, _signal, pids[index], signal.SIGKILL)
+            )
+
+    def _kill_all() -> None:
+        """Kill whatever the commands left running."""
+        if SETSID:
+            for pid in pids.values():
+                _signal(pid, signal.SIGKILL)
+
+    def _on_overflow(index: int) -> None:
+        """Kill a command that passed its output limit, if configured to."""
+        if not commands[index].kill_on_overflow or index in overflowed:
+            return
+        overflowed.add(index)
+        _LOGGER.warning(
+            "출력 크기 제한(%s바이트) 초과로 명령어 종료: %s",
+            commands[index].max_output,
+            commands[index].command,
+        )
+        if index in pids:
+            _signal(pids[index], signal.SIGKILL)
+        # 그룹을 벗어난 프로세스도 파이프를 닫으면 SIGPIPE로 종료됨
+        stdout_transports[index].close()
+
+    async def _async_open(
+        path: str,
+    ) -> tuple[asyncio.StreamReader, asyncio.BaseTransport]:
+        """Open the read end of a named pipe as a stream."""
+        fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+        keepalive.append(os.open(path, os.O_WRONLY | os.O_NONBLOCK | os.O_CLOEXEC))
+        reader = asyncio.StreamReader()
+        transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader),
+            os.fdopen(fd, "rb", buffering=0),
+        )
+        transports.append(transport)
+        return reader, transport
+
+    async def _async_read_output(
+        index: int, stdout: asyncio.StreamReader, stderr: asyncio.StreamReader
+    ) -> tuple[tuple[bytes, int], tuple[bytes, int]]:
+        """Read one command's stdout head and stderr tail."""
+        stdout_frame, stderr_frame = await asyncio.gather(
+            async_read_head(
+                stdout, commands[index].max_output, lambda: _on_overflow(index)
+            ),
+            async_read_tail(stderr, STDERR_TAIL_SIZE),
+        )
+        return stdout_frame, stderr_frame
+
+    async def _async_read_pids(reader: asyncio.StreamReader) -> None:
+        """Start each command's timeout once its PID is reported."""
+        while line := await reader.readline():
+            try:
+                index, pid = (int(field) for field in line.split())
+            except ValueError:
+                continue
+            pids[index] = pid
+            if index in overflowed:
+                _signal(pid, signal.SIGKILL)
+            timers.append(loop.call_later(commands[index].timeout, _kill, index))
+
+    async def _async_read_returncodes(reader: asyncio.StreamReader) -> None:
+        """Record each command's exit code as it is waited for."""
+        while line := await reader.readline():
+            try:
+                index, returncode = (int(field) for field in line.split())
+            except ValueError:
+                continue
+            returncodes[index] = returncode
+
+    try:
+        for index in range(len(commands)):
+            stdout, stdout_transports[index] = await _async_open(
+                os.path.join(directory, f"{index}.out")
+            )
+            stderr, _ = await _async_open(os.path.join(directory, f"{index}.err"))
+            outputs.append(
+                asyncio.create_task(_async_read_output(index, stdout, stderr))
+            )
+
+        proc = await asyncio.create_subprocess_exec(
+            SHELL,
+            "-c",
+            build_script(directory, commands),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+        assert proc.stdout and proc.stderr
+        unregister = register_process(proc)
+        try:
+            async with asyncio.timeout(
+                max(item.timeout for item in commands) + BATCH_TIMEOUT_SLACK
+            ):
+                await asyncio.gather(
+                    _async_read_pids(proc.stderr),
+                    _async_read_returncodes(proc.stdout),
+                    proc.wait(),
+                )
+        finally:
+            for timer in timers:
+                timer.cancel()
+            # 명령어들이 남긴 자식 프로세스 정리
+            signal_group(proc, signal.SIGKILL)
+            _kill_all()
+            unregister()
+
+        # 모든 명령어가 끝났으므로 쓰기 쪽을 닫으면 남은 출력을 읽고 EOF가 됨
+        for fd in keepalive:
+            os.close(fd)
+        keepalive.clear()
+        await asyncio.wait(outputs, timeout=OUTPUT_DRAIN_TIME)
+        for transport in transports:
+            transport.close()
+        frames = await asyncio.gather(*outputs)
+
+        results: list[BatchResult | None] = []
+        for index, ((stdout, stdout_size), (stderr, stderr_size)) in enumerate(frames):
+            if index in killed:
+                results.append(BatchResult(b"", b"", None, True, 0, 0))
+            elif index not in returncodes:
+                results.append(None)
+            else:
+                results.append(
+                    BatchResult(
+                        stdout,
+                        stderr,
+                        returncodes[index],
+                        False,
+                        stdout_size,
+                        stderr_size,
+                    )
+                )
+        return results
+    finally:
+        for task in outputs:
+            task.cancel()
+        for transport in transports:
+            transport.close()
+        for fd in keepalive:
+            os.close(fd)
+        await loop.run_in_executor(None, shutil.rmtree, directory, True)
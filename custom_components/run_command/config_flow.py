@@ -14,25 +14,144 @@ from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import selector
 
 from .const import (
+    CONF_ADAPTIVE_INTERVAL,
+    CONF_ALWAYS_RENDER,
     CONF_ATTRIBUTE_TEMPLATES,
+    CONF_CGROUP,
+    CONF_CHILD_SENSORS,
     CONF_COMMAND,
+    CONF_CPU_TIME_LIMIT,
+    CONF_DEADBAND,
+    CONF_DEADBAND_TYPE,
+    CONF_EXECUTION_MODE,
+    CONF_EXTRACTOR,
+    CONF_EXTRACTOR_EXPRESSION,
+    CONF_FAILURE_THRESHOLD,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_IO_CLASS,
     CONF_KEEP_LAST_VALUE,
+    CONF_KILL_ON_OVERFLOW,
+    CONF_MAX_OPEN_FILES,
+    CONF_MAX_OUTPUT_SIZE,
+    CONF_MEMORY_LIMIT,
+    CONF_MIN_WRITE_INTERVAL,
     CONF_NAME,
+    CONF_NICE,
+    CONF_OUTPUT_CACHE_TTL,
+    CONF_POLL_FALLBACK,
+    CONF_PRIORITY,
+    CONF_REMOTE_HOST,
+    CONF_REMOTE_IDENTITY,
+    CONF_REMOTE_PORT,
+    CONF_RESULT_TTL,
     CONF_SCAN_INTERVAL,
+    CONF_SOURCE_TYPE,
+    CONF_STARTUP_MODE,
+    CONF_STREAM_FORMAT,
     CONF_TIMEOUT,
     CONF_UNIT_OF_MEASUREMENT,
+    CONF_UPDATE_MODE,
     CONF_VALUE_TEMPLATE,
     CONF_REMOVE_UNIT,
+    DEADBAND_TYPES,
+    DEFAULT_DEADBAND_TYPE,
+    DEFAULT_EXECUTION_MODE,
+    DEFAULT_FAILURE_THRESHOLD,
+    DEFAULT_MAX_OUTPUT_SIZE,
     DEFAULT_NAME,
+    DEFAULT_PRIORITY,
+    DEFAULT_REMOTE_PORT,
+    DEFAULT_RESULT_TTL,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SOURCE_TYPE,
+    DEFAULT_STARTUP_MODE,
+    DEFAULT_STREAM_FORMAT,
     DEFAULT_TIMEOUT,
+    DEFAULT_UPDATE_MODE,
     DOMAIN,
+    EXECUTION_MODES,
+    EXTRACTOR_NONE,
+    EXTRACTORS,
+    IO_CLASS_NONE,
+    IO_CLASSES,
     MAX_TIMEOUT,
+    SOURCE_TYPE_FILE,
+    SOURCE_TYPES,
+    STARTUP_MODES,
+    STREAM_FORMATS,
+    UPDATE_MODE_STREAM,
+    UPDATE_MODES,
 )
 
+from .extract import compile_extractor
+
 _LOGGER = logging.getLogger(__name__)
 
 
+SOURCE_TYPE_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=SOURCE_TYPES,
+        mode=selector.SelectSelectorMode.DROPDOWN,
+        translation_key=CONF_SOURCE_TYPE,
+    )
+)
+
+EXECUTION_MODE_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=EXECUTION_MODES,
+        mode=selector.SelectSelectorMode.DROPDOWN,
+        translation_key=CONF_EXECUTION_MODE,
+    )
+)
+
+UPDATE_MODE_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=UPDATE_MODES,
+        mode=selector.SelectSelectorMode.DROPDOWN,
+        translation_key=CONF_UPDATE_MODE,
+    )
+)
+STREAM_FORMAT_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=STREAM_FORMATS,
+        mode=selector.SelectSelectorMode.DROPDOWN,
+        translation_key=CONF_STREAM_FORMAT,
+    )
+)
+
+EXTRACTOR_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=EXTRACTORS,
+        mode=selector.SelectSelectorMode.DROPDOWN,
+        translation_key=CONF_EXTRACTOR,
+    )
+)
+
+IO_CLASS_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=IO_CLASSES,
+        mode=selector.SelectSelectorMode.DROPDOWN,
+        translation_key=CONF_IO_CLASS,
+    )
+)
+
+STARTUP_MODE_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=STARTUP_MODES,
+        mode=selector.SelectSelectorMode.DROPDOWN,
+        translation_key=CONF_STARTUP_MODE,
+    )
+)
+
+DEADBAND_TYPE_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=DEADBAND_TYPES,
+        mode=selector.SelectSelectorMode.DROPDOWN,
+        translation_key=CONF_DEADBAND_TYPE,
+    )
+)
+
+
 def validate_attribute_templates(value: str) -> dict[str, str]:
     """Validate attribute templates JSON format."""
     if not value:
@@ -49,6 +168,77 @@ def validate_attribute_templates(value: str) -> dict[str, str]:
         raise vol.Invalid(f"유효하지 않은 JSON 형식: {err}")
 
 
+def validate_extractor(config: dict[str, Any]) -> None:
+    """Validate that the extractor expression compiles."""
+    try:
+        compile_extractor(
+            config.get(CONF_EXTRACTOR, EXTRACTOR_NONE),
+            config.get(CONF_EXTRACTOR_EXPRESSION) or "",
+        )
+    except ValueError as err:
+        raise vol.Invalid(str(err)) from err
+
+
+def validate_source(config: dict[str, Any]) -> None:
+    """Validate that the update mode works with the source type."""
+    if (
+        config.get(CONF_SOURCE_TYPE) == SOURCE_TYPE_FILE
+        and config.get(CONF_UPDATE_MODE) == UPDATE_MODE_STREAM
+    ):
+        raise vol.Invalid("파일 소스는 스트림 모드를 지원하지 않습니다")
+
+
+def validate_child_sensors(value: str) -> dict[str, dict[str, Any]]:
+    """Validate child sensors JSON format.
+
+    Each child is either a value template string or an object with
+    value_template, attribute_templates, unit_of_measurement, extractor and
+    extractor_expression.
+    """
+    if not value:
+        return {}
+    try:
+        children = json.loads(value)
+    except json.JSONDecodeError as err:
+        raise vol.Invalid(f"유효하지 않은 JSON 형식: {err}")
+    if not isinstance(children, dict):
+        raise vol.Invalid("자식 센서는 JSON 객체여야 합니다")
+
+    result: dict[str, dict[str, Any]] = {}
+    for key, child in children.items():
+        if isinstance(child, str):
+            child = {CONF_VALUE_TEMPLATE: child}
+        if not isinstance(child, dict) or not set(child) <= {
+            CONF_VALUE_TEMPLATE,
+            CONF_ATTRIBUTE_TEMPLATES,
+            CONF_UNIT_OF_MEASUREMENT,
+            CONF_EXTRACTOR,
+            CONF_EXTRACTOR_EXPRESSION,
+        }:
+            raise vol.Invalid(
+                f"자식 센서 '{key}'는 템플릿 문자열이거나 value_template, "
+                "attribute_templates, unit_of_measurement, extractor, "
+                "extractor_expression 객체여야 합니다"
+            )
+        try:
+            validate_extractor(child)
+        except vol.Invalid as err:
+            raise vol.Invalid(f"자식 센서 '{key}'의 추출기 오류: {err}") from err
+        attributes = child.get(CONF_ATTRIBUTE_TEMPLATES) or {}
+        if not isinstance(attributes, dict) or not all(
+            isinstance(val, str) for val in attributes.values()
+        ):
+            raise vol.Invalid(f"자식 센서 '{key}'의 속성 템플릿은 문자열 객체여야 합니다")
+        result[key] = {
+            CONF_VALUE_TEMPLATE: child.get(CONF_VALUE_TEMPLATE) or "",
+            CONF_ATTRIBUTE_TEMPLATES: attributes,
+            CONF_UNIT_OF_MEASUREMENT: child.get(CONF_UNIT_OF_MEASUREMENT) or None,
+            CONF_EXTRACTOR: child.get(CONF_EXTRACTOR) or EXTRACTOR_NONE,
+            CONF_EXTRACTOR_EXPRESSION: child.get(CONF_EXTRACTOR_EXPRESSION) or "",
+        }
+    return result
+
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Run Command."""
 
@@ -74,6 +264,17 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 else:
                     user_input[CONF_ATTRIBUTE_TEMPLATES] = {}
 
+                # 값 추출기 표현식 유효성 검사
+                validate_extractor(user_input)
+
+                # 소스 종류와 업데이트 방식 조합 검사
+                validate_source(user_input)
+
+                # 자식 센서 유효성 검사 (JSON 문자열을 딕셔너리로 변환)
+                user_input[CONF_CHILD_SENSORS] = validate_child_sensors(
+                    user_input.get(CONF_CHILD_SENSORS, "")
+                )
+
                 # 측정 단위가 빈 문자열이면 None으로 변환
                 if user_input.get(CONF_UNIT_OF_MEASUREMENT) == "":
                     user_input[CONF_UNIT_OF_MEASUREMENT] = None
@@ -113,6 +314,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         data_schema = vol.Schema(
             {
                 vol.Required(CONF_NAME, default=DEFAULT_NAME): str,
+                vol.Optional(
+                    CONF_SOURCE_TYPE, default=DEFAULT_SOURCE_TYPE
+                ): SOURCE_TYPE_SELECTOR,
                 vol.Required(CONF_COMMAND): selector.TemplateSelector(),
                 vol.Optional(
                     CONF_TIMEOUT, default=DEFAULT_TIMEOUT
@@ -121,10 +325,73 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL
                 ): vol.All(vol.Coerce(int), vol.Range(min=1)),
                 vol.Optional(CONF_VALUE_TEMPLATE, default=""): selector.TemplateSelector(),
+                vol.Optional(CONF_EXTRACTOR, default=EXTRACTOR_NONE): EXTRACTOR_SELECTOR,
+                vol.Optional(CONF_EXTRACTOR_EXPRESSION, default=""): str,
                 vol.Optional(CONF_ATTRIBUTE_TEMPLATES, default=""): selector.TemplateSelector(),
+                vol.Optional(CONF_CHILD_SENSORS, default=""): selector.TemplateSelector(),
                 vol.Optional(CONF_UNIT_OF_MEASUREMENT, default=""): str,
                 vol.Optional(CONF_REMOVE_UNIT, default=False): bool,
                 vol.Optional(CONF_KEEP_LAST_VALUE, default=False): bool,
+                vol.Optional(
+                    CONF_RESULT_TTL, default=DEFAULT_RESULT_TTL
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_TIMEOUT)),
+                vol.Optional(CONF_PRIORITY, default=DEFAULT_PRIORITY): vol.Coerce(int),
+                vol.Optional(
+                    CONF_EXECUTION_MODE, default=DEFAULT_EXECUTION_MODE
+                ): EXECUTION_MODE_SELECTOR,
+                vol.Optional(CONF_REMOTE_HOST, default=""): str,
+                vol.Optional(
+                    CONF_REMOTE_PORT, default=DEFAULT_REMOTE_PORT
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=65535)),
+                vol.Optional(CONF_REMOTE_IDENTITY, default=""): str,
+                vol.Optional(
+                    CONF_UPDATE_MODE, default=DEFAULT_UPDATE_MODE
+                ): UPDATE_MODE_SELECTOR,
+                vol.Optional(
+                    CONF_STREAM_FORMAT, default=DEFAULT_STREAM_FORMAT
+                ): STREAM_FORMAT_SELECTOR,
+                vol.Optional(CONF_POLL_FALLBACK, default=False): bool,
+                vol.Optional(
+                    CONF_STARTUP_MODE, default=DEFAULT_STARTUP_MODE
+                ): STARTUP_MODE_SELECTOR,
+                vol.Optional(CONF_OUTPUT_CACHE_TTL, default=0): vol.All(
+                    vol.Coerce(int), vol.Range(min=0)
+                ),
+                vol.Optional(
+                    CONF_MAX_OUTPUT_SIZE, default=DEFAULT_MAX_OUTPUT_SIZE
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(CONF_KILL_ON_OVERFLOW, default=False): bool,
+                vol.Optional(CONF_ALWAYS_RENDER, default=False): bool,
+                vol.Optional(
+                    CONF_FAILURE_THRESHOLD, default=DEFAULT_FAILURE_THRESHOLD
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(CONF_ADAPTIVE_INTERVAL, default=False): bool,
+                vol.Optional(CONF_NICE, default=0): vol.All(
+                    vol.Coerce(int), vol.Range(min=-20, max=19)
+                ),
+                vol.Optional(CONF_IO_CLASS, default=IO_CLASS_NONE): IO_CLASS_SELECTOR,
+                vol.Optional(CONF_MEMORY_LIMIT, default=0): vol.All(
+                    vol.Coerce(int), vol.Range(min=0)
+                ),
+                vol.Optional(CONF_CPU_TIME_LIMIT, default=0): vol.All(
+                    vol.Coerce(int), vol.Range(min=0)
+                ),
+                vol.Optional(CONF_MAX_OPEN_FILES, default=0): vol.All(
+                    vol.Coerce(int), vol.Range(min=0)
+                ),
+                vol.Optional(CONF_CGROUP, default=""): str,
+                vol.Optional(CONF_DEADBAND, default=0): vol.All(
+                    vol.Coerce(float), vol.Range(min=0)
+                ),
+                vol.Optional(
+                    CONF_DEADBAND_TYPE, default=DEFAULT_DEADBAND_TYPE
+                ): DEADBAND_TYPE_SELECTOR,
+                vol.Optional(CONF_MIN_WRITE_INTERVAL, default=0): vol.All(
+                    vol.Coerce(int), vol.Range(min=0)
+                ),
+                vol.Optional(CONF_HEARTBEAT_INTERVAL, default=0): vol.All(
+                    vol.Coerce(int), vol.Range(min=0)
+                ),
             }
         )
 
@@ -166,6 +433,17 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 else:
                     user_input[CONF_ATTRIBUTE_TEMPLATES] = {}
 
+                # 값 추출기 표현식 유효성 검사
+                validate_extractor(user_input)
+
+                # 소스 종류와 업데이트 방식 조합 검사
+                validate_source(user_input)
+
+                # 자식 센서 유효성 검사 (JSON 문자열을 딕셔너리로 변환)
+                user_input[CONF_CHILD_SENSORS] = validate_child_sensors(
+                    user_input.get(CONF_CHILD_SENSORS, "")
+                )
+
                 # 측정 단위 제거 처리
                 if user_input.get(CONF_REMOVE_UNIT, False):
                     user_input[CONF_UNIT_OF_MEASUREMENT] = None
@@ -228,12 +506,23 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             except Exception:
                 attr_templates_str = ""
 
+        # 자식 센서를 JSON 문자열로 변환 (멀티라인 유지)
+        child_sensors_str = ""
+        if current_data.get(CONF_CHILD_SENSORS):
+            child_sensors_str = json.dumps(
+                current_data[CONF_CHILD_SENSORS], ensure_ascii=False, indent=2
+            )
+
         data_schema = vol.Schema(
             {
                 vol.Required(
                     CONF_NAME, 
                     default=current_data.get(CONF_NAME, DEFAULT_NAME)
                 ): str,
+                vol.Optional(
+                    CONF_SOURCE_TYPE,
+                    default=current_data.get(CONF_SOURCE_TYPE, DEFAULT_SOURCE_TYPE)
+                ): SOURCE_TYPE_SELECTOR,
                 vol.Required(
                     CONF_COMMAND,
                     default=current_data.get(CONF_COMMAND, "")
@@ -250,10 +539,22 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     CONF_VALUE_TEMPLATE,
                     default=current_data.get(CONF_VALUE_TEMPLATE, "")
                 ): selector.TemplateSelector(),
+                vol.Optional(
+                    CONF_EXTRACTOR,
+                    default=current_data.get(CONF_EXTRACTOR, EXTRACTOR_NONE)
+                ): EXTRACTOR_SELECTOR,
+                vol.Optional(
+                    CONF_EXTRACTOR_EXPRESSION,
+                    default=current_data.get(CONF_EXTRACTOR_EXPRESSION, "")
+                ): str,
                 vol.Optional(
                     CONF_ATTRIBUTE_TEMPLATES,
                     default=attr_templates_str
                 ): selector.TemplateSelector(),
+                vol.Optional(
+                    CONF_CHILD_SENSORS,
+                    default=child_sensors_str
+                ): selector.TemplateSelector(),
                 vol.Optional(
                     CONF_UNIT_OF_MEASUREMENT,
                     default=current_data.get(CONF_UNIT_OF_MEASUREMENT, "") or ""
@@ -266,6 +567,112 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     CONF_KEEP_LAST_VALUE,
                     default=current_data.get(CONF_KEEP_LAST_VALUE, False)
                 ): bool,
+                vol.Optional(
+                    CONF_RESULT_TTL,
+                    default=current_data.get(CONF_RESULT_TTL, DEFAULT_RESULT_TTL)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_TIMEOUT)),
+                vol.Optional(
+                    CONF_PRIORITY,
+                    default=current_data.get(CONF_PRIORITY, DEFAULT_PRIORITY)
+                ): vol.Coerce(int),
+                vol.Optional(
+                    CONF_EXECUTION_MODE,
+                    default=current_data.get(CONF_EXECUTION_MODE, DEFAULT_EXECUTION_MODE)
+                ): EXECUTION_MODE_SELECTOR,
+                vol.Optional(
+                    CONF_REMOTE_HOST,
+                    default=current_data.get(CONF_REMOTE_HOST, "")
+                ): str,
+                vol.Optional(
+                    CONF_REMOTE_PORT,
+                    default=current_data.get(CONF_REMOTE_PORT, DEFAULT_REMOTE_PORT)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=65535)),
+                vol.Optional(
+                    CONF_REMOTE_IDENTITY,
+                    default=current_data.get(CONF_REMOTE_IDENTITY, "")
+                ): str,
+                vol.Optional(
+                    CONF_UPDATE_MODE,
+                    default=current_data.get(CONF_UPDATE_MODE, DEFAULT_UPDATE_MODE)
+                ): UPDATE_MODE_SELECTOR,
+                vol.Optional(
+                    CONF_STREAM_FORMAT,
+                    default=current_data.get(CONF_STREAM_FORMAT, DEFAULT_STREAM_FORMAT)
+                ): STREAM_FORMAT_SELECTOR,
+                vol.Optional(
+                    CONF_POLL_FALLBACK,
+                    default=current_data.get(CONF_POLL_FALLBACK, False)
+                ): bool,
+                vol.Optional(
+                    CONF_STARTUP_MODE,
+                    default=current_data.get(CONF_STARTUP_MODE, DEFAULT_STARTUP_MODE)
+                ): STARTUP_MODE_SELECTOR,
+                vol.Optional(
+                    CONF_OUTPUT_CACHE_TTL,
+                    default=current_data.get(CONF_OUTPUT_CACHE_TTL, 0)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_MAX_OUTPUT_SIZE,
+                    default=current_data.get(CONF_MAX_OUTPUT_SIZE, DEFAULT_MAX_OUTPUT_SIZE)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_KILL_ON_OVERFLOW,
+                    default=current_data.get(CONF_KILL_ON_OVERFLOW, False)
+                ): bool,
+                vol.Optional(
+                    CONF_ALWAYS_RENDER,
+                    default=current_data.get(CONF_ALWAYS_RENDER, False)
+                ): bool,
+                vol.Optional(
+                    CONF_FAILURE_THRESHOLD,
+                    default=current_data.get(
+                        CONF_FAILURE_THRESHOLD, DEFAULT_FAILURE_THRESHOLD
+                    )
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_ADAPTIVE_INTERVAL,
+                    default=current_data.get(CONF_ADAPTIVE_INTERVAL, False)
+                ): bool,
+                vol.Optional(
+                    CONF_NICE,
+                    default=current_data.get(CONF_NICE, 0)
+                ): vol.All(vol.Coerce(int), vol.Range(min=-20, max=19)),
+                vol.Optional(
+                    CONF_IO_CLASS,
+                    default=current_data.get(CONF_IO_CLASS, IO_CLASS_NONE)
+                ): IO_CLASS_SELECTOR,
+                vol.Optional(
+                    CONF_MEMORY_LIMIT,
+                    default=current_data.get(CONF_MEMORY_LIMIT, 0)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_CPU_TIME_LIMIT,
+                    default=current_data.get(CONF_CPU_TIME_LIMIT, 0)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_MAX_OPEN_FILES,
+                    default=current_data.get(CONF_MAX_OPEN_FILES, 0)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_CGROUP,
+                    default=current_data.get(CONF_CGROUP, "")
+                ): str,
+                vol.Optional(
+                    CONF_DEADBAND,
+                    default=current_data.get(CONF_DEADBAND, 0)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_DEADBAND_TYPE,
+                    default=current_data.get(CONF_DEADBAND_TYPE, DEFAULT_DEADBAND_TYPE)
+                ): DEADBAND_TYPE_SELECTOR,
+                vol.Optional(
+                    CONF_MIN_WRITE_INTERVAL,
+                    default=current_data.get(CONF_MIN_WRITE_INTERVAL, 0)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_HEARTBEAT_INTERVAL,
+                    default=current_data.get(CONF_HEARTBEAT_INTERVAL, 0)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
             }
         )
 
@@ -13,7 +13,99 @@ CONF_TIMEOUT: Final = "timeout"
 CONF_UNIT_OF_MEASUREMENT: Final = "unit_of_measurement"
 CONF_KEEP_LAST_VALUE: Final = "keep_last_value"
 CONF_REMOVE_UNIT: Final = "remove_unit"
+CONF_RESULT_TTL: Final = "result_ttl"
+CONF_PRIORITY: Final = "priority"
+CONF_MAX_CONCURRENCY: Final = "max_concurrency"
+CONF_EXECUTION_MODE: Final = "execution_mode"
+CONF_UPDATE_MODE: Final = "update_mode"
+CONF_STREAM_FORMAT: Final = "stream_format"
+CONF_MAX_OUTPUT_SIZE: Final = "max_output_size"
+CONF_KILL_ON_OVERFLOW: Final = "kill_on_overflow"
+CONF_ALWAYS_RENDER: Final = "always_render"
+CONF_CHILD_SENSORS: Final = "child_sensors"
+CONF_FAILURE_THRESHOLD: Final = "failure_threshold"
+CONF_ADAPTIVE_INTERVAL: Final = "adaptive_interval"
+CONF_NICE: Final = "nice"
+CONF_IO_CLASS: Final = "io_class"
+CONF_MEMORY_LIMIT: Final = "memory_limit"
+CONF_CPU_TIME_LIMIT: Final = "cpu_time_limit"
+CONF_MAX_OPEN_FILES: Final = "max_open_files"
+CONF_CGROUP: Final = "cgroup"
+CONF_EXTRACTOR: Final = "extractor"
+CONF_EXTRACTOR_EXPRESSION: Final = "extractor_expression"
+CONF_DEADBAND: Final = "deadband"
+CONF_DEADBAND_TYPE: Final = "deadband_type"
+CONF_MIN_WRITE_INTERVAL: Final = "min_write_interval"
+CONF_HEARTBEAT_INTERVAL: Final = "heartbeat_interval"
+CONF_POLL_FALLBACK: Final = "poll_fallback"
+CONF_STARTUP_MODE: Final = "startup_mode"
+CONF_OUTPUT_CACHE_TTL: Final = "output_cache_ttl"
+CONF_REMOTE_HOST: Final = "remote_host"
+CONF_REMOTE_PORT: Final = "remote_port"
+CONF_REMOTE_IDENTITY: Final = "remote_identity"
+CONF_SOURCE_TYPE: Final = "source_type"
 
+# Source types
+SOURCE_TYPE_COMMAND: Final = "command"
+SOURCE_TYPE_FILE: Final = "file"
+SOURCE_TYPES: Final = [SOURCE_TYPE_COMMAND, SOURCE_TYPE_FILE]
+
+# Execution modes
+EXECUTION_MODE_SHELL: Final = "shell"
+EXECUTION_MODE_PERSISTENT: Final = "persistent"
+EXECUTION_MODE_EXEC: Final = "exec"
+EXECUTION_MODE_AUTO: Final = "auto"
+EXECUTION_MODE_BATCH: Final = "batch"
+EXECUTION_MODES: Final = [
+    EXECUTION_MODE_SHELL,
+    EXECUTION_MODE_AUTO,
+    EXECUTION_MODE_EXEC,
+    EXECUTION_MODE_PERSISTENT,
+    EXECUTION_MODE_BATCH,
+]
+
+# Update modes
+UPDATE_MODE_POLL: Final = "poll"
+UPDATE_MODE_STREAM: Final = "stream"
+UPDATE_MODE_EVENT: Final = "event"
+UPDATE_MODES: Final = [UPDATE_MODE_POLL, UPDATE_MODE_STREAM, UPDATE_MODE_EVENT]
+
+# Stream output formats
+STREAM_FORMAT_LINE: Final = "line"
+STREAM_FORMAT_JSON: Final = "json"
+STREAM_FORMATS: Final = [STREAM_FORMAT_LINE, STREAM_FORMAT_JSON]
+
+# Startup modes
+STARTUP_MODE_BLOCKING: Final = "blocking"
+STARTUP_MODE_RESTORE: Final = "restore"
+STARTUP_MODES: Final = [STARTUP_MODE_BLOCKING, STARTUP_MODE_RESTORE]
+
+# I/O scheduling classes
+IO_CLASS_NONE: Final = "none"
+IO_CLASS_BEST_EFFORT: Final = "best_effort"
+IO_CLASS_IDLE: Final = "idle"
+IO_CLASSES: Final = [IO_CLASS_NONE, IO_CLASS_BEST_EFFORT, IO_CLASS_IDLE]
+
+# Value extractors
+EXTRACTOR_NONE: Final = "none"
+EXTRACTOR_JSONPATH: Final = "jsonpath"
+EXTRACTOR_REGEX: Final = "regex"
+EXTRACTOR_CSV: Final = "csv"
+EXTRACTOR_KEY_VALUE: Final = "key_value"
+EXTRACTOR_LINE_FIELD: Final = "line_field"
+EXTRACTORS: Final = [
+    EXTRACTOR_NONE,
+    EXTRACTOR_JSONPATH,
+    EXTRACTOR_REGEX,
+    EXTRACTOR_CSV,
+    EXTRACTOR_KEY_VALUE,
+    EXTRACTOR_LINE_FIELD,
+]
+
+# Deadband types
+DEADBAND_ABSOLUTE: Final = "absolute"
+DEADBAND_PERCENT: Final = "percent"
+DEADBAND_TYPES: Final = [DEADBAND_ABSOLUTE, DEADBAND_PERCENT]
 
 
 # Default values
@@ -21,7 +113,79 @@ DEFAULT_SCAN_INTERVAL: Final = 30
 DEFAULT_NAME: Final = "Run Command Sensor"
 DEFAULT_TIMEOUT: Final = 60
 MAX_TIMEOUT: Final = 600
+DEFAULT_RESULT_TTL: Final = 0
+DEFAULT_PRIORITY: Final = 0
+DEFAULT_MAX_CONCURRENCY: Final = 8
+DEFAULT_EXECUTION_MODE: Final = EXECUTION_MODE_SHELL
+SHELL_WORKER_POOL_SIZE: Final = 4
+DEFAULT_UPDATE_MODE: Final = UPDATE_MODE_POLL
+DEFAULT_STREAM_FORMAT: Final = STREAM_FORMAT_LINE
+DEFAULT_MAX_OUTPUT_SIZE: Final = 1024  # KiB
+DEFAULT_FAILURE_THRESHOLD: Final = 5
+DEFAULT_DEADBAND_TYPE: Final = DEADBAND_ABSOLUTE
+DEFAULT_STARTUP_MODE: Final = STARTUP_MODE_BLOCKING
+DEFAULT_REMOTE_PORT: Final = 22
+DEFAULT_SOURCE_TYPE: Final = SOURCE_TYPE_COMMAND
+
+# Stream supervision
+STREAM_RESTART_MIN: Final = 1
+STREAM_RESTART_MAX: Final = 300
+STREAM_STABLE_TIME: Final = 60
+STREAM_LINE_LIMIT: Final = 1024 * 1024
+
+# 시간 초과 시 SIGTERM 후 SIGKILL까지 기다리는 시간
+KILL_GRACE_TIME: Final = 2
+
+# 배치 실행: 이 시간(초) 안에 요청된 명령어를 모아 한 셸에서 실행
+BATCH_WINDOW: Final = 0.05
+BATCH_MAX_SIZE: Final = 32
+
+# 이벤트 모드: 참조 엔티티가 연달아 바뀌면 이 시간(초)에 한 번만 실행
+EVENT_DEBOUNCE_TIME: Final = 1.0
+
+# 복원 시작 모드: 첫 실행 사이의 간격 (초)
+STARTUP_SPACING: Final = 0.2
+
+# SSH 원격 실행: 호스트당 동시 채널 수, 연결 유지/확인 간격, 재연결 최대 대기 시간 (초)
+REMOTE_MAX_CHANNELS: Final = 8
+REMOTE_PERSIST: Final = 600
+REMOTE_KEEPALIVE: Final = 15
+REMOTE_CONNECT_TIMEOUT: Final = 10
+REMOTE_BACKOFF_MAX: Final = 300
+
+# 파일 소스: 열어 둘 파일 디스크립터 최대 수
+FILE_MAX_OPEN: Final = 256
+
+# Failure backoff
+BACKOFF_MAX_DELAY: Final = 300
+CIRCUIT_OPEN_TIME: Final = 600
+
+# 이 크기(바이트) 이상의 출력은 실행기 스레드에서 디코딩/파싱
+OFFLOAD_THRESHOLD: Final = 64 * 1024
+
+# 마지막 출력 저장: 쓰기 지연 시간(초)과 저장할 최대 출력 크기(문자)
+OUTPUT_CACHE_SAVE_DELAY: Final = 30
+OUTPUT_CACHE_MAX_SIZE: Final = 64 * 1024
+
+# 실행 통계에 보관할 최근 실행 수
+STATS_WINDOW: Final = 100
+
+# hass.data keys
+DATA_EXECUTOR: Final = "executor"
+DATA_STATS: Final = "stats"
+DATA_STARTUP: Final = "startup"
+DATA_REFRESH: Final = "refresh"
+
+# Services
+SERVICE_EXECUTE: Final = "execute"
+ATTR_ENTRY_ID: Final = "entry_id"
 
 # Attribute names
 ATTR_LAST_UPDATE: Final = "last_update"
 ATTR_LAST_ERROR: Final = "last_error"
+ATTR_QUEUE_WAIT: Final = "queue_wait"
+ATTR_OUTPUT_TRUNCATED: Final = "output_truncated"
+ATTR_CONSECUTIVE_FAILURES: Final = "consecutive_failures"
+ATTR_CIRCUIT: Final = "circuit"
+ATTR_NEXT_ATTEMPT: Final = "next_attempt"
+ATTR_POLL_INTERVAL: Final = "poll_interval"
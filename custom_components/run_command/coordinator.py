@@ -0,0 +1,160 @@
+"""Data update coordinator for Run Command integration."""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import TemplateError
+from homeassistant.helpers.template import Template
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_ALWAYS_RENDER,
+    CONF_COMMAND,
+    CONF_NAME,
+    CONF_PRIORITY,
+    CONF_RESULT_TTL,
+    CONF_SCAN_INTERVAL,
+    DEFAULT_PRIORITY,
+    DEFAULT_RESULT_TTL,
+    DEFAULT_SCAN_INTERVAL,
+    OFFLOAD_THRESHOLD,
+)
+from .executor import CommandOptions, CommandResult, async_get_executor
+from .output_cache import CachedOutput, OutputCache, output_key
+from .parsing import parse_json, prepare_output
+from .telemetry import CommandStats
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CommandOutput:
+    """Parsed output of a command, shared by every child sensor.
+
+    Only the raw text is compared, so identical output does not notify
+    listeners unless the coordinator always updates.
+    """
+
+    raw: str
+    value_json: Any = field(compare=False)
+    updated: datetime = field(compare=False)
+
+
+class RunCommandCoordinator(DataUpdateCoordinator[CommandOutput]):
+    """Run one command per interval and parse its output once."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config: dict[str, Any],
+        always_update: bool,
+        stats: CommandStats,
+        uses_value_json: bool = True,
+        output_cache: OutputCache | None = None,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=config[CONF_NAME],
+            update_interval=timedelta(
+                seconds=config.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+            ),
+            always_update=always_update or config.get(CONF_ALWAYS_RENDER, False),
+        )
+        self._command_template = Template(config[CONF_COMMAND], hass)
+        self._command_options = CommandOptions.from_config(config)
+        self._result_ttl = config.get(CONF_RESULT_TTL, DEFAULT_RESULT_TTL)
+        self._priority = config.get(CONF_PRIORITY, DEFAULT_PRIORITY)
+        self._stats = stats
+        self._uses_value_json = uses_value_json
+        self._output_cache = output_cache
+        self._cache_checked = False
+
+    async def _async_update_data(self) -> CommandOutput:
+        """Run the command, parse its output and record its statistics.
+
+        The first update uses the stored output instead if it is still fresh
+        and was produced by the same command and options.
+        """
+        if not self._cache_checked:
+            self._cache_checked = True
+            if self._output_cache is not None and (
+                cached := await self._async_load_cached_output()
+            ):
+                value_json = parse_json(cached.raw) if self._uses_value_json else None
+                return CommandOutput(cached.raw, value_json, cached.updated)
+
+        started = time.monotonic()
+        result: CommandResult | None = None
+        parse_time = loop_time = 0.0
+        try:
+            command = self._render_command()
+            result = await async_get_executor(self.hass).async_run(
+                command, self._command_options, self._result_ttl, self._priority
+            )
+            self._check_result(result)
+
+            # 큰 출력은 디코딩과 JSON 파싱을 실행기 스레드에서 처리
+            # (JSON 파싱은 자식 센서 수와 관계없이 한 번만, value_json을 쓰는 경우에만 수행)
+            parse_started = time.monotonic()
+            prepare_args = (
+                result.stdout, result.truncated, self._uses_value_json, None
+            )
+            if len(result.stdout) >= OFFLOAD_THRESHOLD:
+                raw_result, value_json, _ = await self.hass.async_add_executor_job(
+                    prepare_output, *prepare_args
+                )
+            else:
+                raw_result, value_json, _ = prepare_output(*prepare_args)
+                loop_time = time.monotonic() - parse_started
+            parse_time = time.monotonic() - parse_started
+
+            output = CommandOutput(raw_result, value_json, dt_util.now())
+            if self._output_cache is not None:
+                self._output_cache.async_record(
+                    output_key(command, self._command_options),
+                    raw_result,
+                    result.returncode,
+                    output.updated,
+                )
+            return output
+        finally:
+            self._stats.async_record(
+                result, time.monotonic() - started, parse_time, loop_time
+            )
+
+    def _render_command(self) -> str:
+        """Render the command."""
+        try:
+            return self._command_template.async_render()
+        except TemplateError as err:
+            raise UpdateFailed(f"Command template error: {err}") from err
+
+    async def _async_load_cached_output(self) -> CachedOutput | None:
+        """Return the stored output of the current command, if still fresh."""
+        assert self._output_cache is not None
+        try:
+            command = self._command_template.async_render()
+        except TemplateError:
+            return None
+        return await self._output_cache.async_load(
+            output_key(command, self._command_options)
+        )
+
+    def _check_result(self, result: CommandResult) -> None:
+        """Raise UpdateFailed if the command timed out or failed."""
+        if result.timed_out:
+            raise UpdateFailed(
+                f"Command timeout after {self._command_options.timeout} seconds"
+            )
+        if result.returncode != 0 and not (
+            result.truncated and self._command_options.kill_on_overflow
+        ):
+            raise UpdateFailed(result.stderr.decode(errors="replace").strip())
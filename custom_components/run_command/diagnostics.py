@@ -0,0 +1,35 @@
+"""Diagnostics support for Run Command integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_COMMAND, DATA_STATS, DOMAIN
+from .executor import async_get_executor
+
+# 명령어에는 비밀번호나 토큰이 포함될 수 있음
+TO_REDACT = {CONF_COMMAND}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    executor = async_get_executor(hass)
+    stats = hass.data[DOMAIN].get(DATA_STATS, {}).get(entry.entry_id)
+
+    return {
+        "config": async_redact_data(dict(entry.data), TO_REDACT),
+        "stats": stats.as_dict() if stats else None,
+        "executor": {
+            "max_concurrency": executor.limiter.limit,
+            "active": executor.limiter.active,
+            "queued": executor.limiter.queued,
+            "running_processes": executor.running_processes,
+            "killed_processes": executor.killed_processes,
+            "leaked_processes": executor.leaked_processes,
+        },
+    }
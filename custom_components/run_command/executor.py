@@ -0,0 +1,635 @@
+"""Shared command executor for Run Command integration."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import shlex
+import signal
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_EXECUTION_MODE,
+    CONF_KILL_ON_OVERFLOW,
+    CONF_MAX_OUTPUT_SIZE,
+    CONF_SOURCE_TYPE,
+    CONF_TIMEOUT,
+    DATA_EXECUTOR,
+    DEFAULT_EXECUTION_MODE,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_OUTPUT_SIZE,
+    DEFAULT_PRIORITY,
+    DEFAULT_SOURCE_TYPE,
+    DEFAULT_TIMEOUT,
+    BATCH_MAX_SIZE,
+    BATCH_WINDOW,
+    DOMAIN,
+    EXECUTION_MODE_AUTO,
+    EXECUTION_MODE_BATCH,
+    EXECUTION_MODE_EXEC,
+    EXECUTION_MODE_PERSISTENT,
+    SHELL_WORKER_POOL_SIZE,
+    SOURCE_TYPE_FILE,
+)
+from .batch import BatchCommand, async_run_batch
+from .file_source import FileReader, parse_paths
+from .limits import ResourceLimits
+from .remote import SSH_CONNECTION_ERROR, RemoteConnections, RemoteHost
+from .process import (
+    async_kill_group,
+    async_read_head,
+    async_read_tail,
+    signal_group,
+)
+from .shell_worker import STDERR_TAIL_SIZE, ShellWorkerPool
+
+_LOGGER = logging.getLogger(__name__)
+
+# 이 문자가 있으면 셸 해석(파이프, 리다이렉션, 변수 확장, 글롭 등)이 필요함
+SHELL_METACHARACTERS = frozenset("|&;<>()$`*?[]~#\n\\")
+# 셸 내장 명령어나 예약어는 실행 파일로 실행할 수 없음
+SHELL_BUILTINS = frozenset(
+    {
+        ".", ":", "alias", "break", "case", "cd", "command", "continue", "eval",
+        "exec", "exit", "export", "for", "function", "if", "read", "readonly",
+        "return", "set", "shift", "source", "time", "trap", "type", "ulimit",
+        "umask", "unalias", "unset", "until", "wait", "while", "{", "!",
+    }
+)
+
+
+@dataclass(frozen=True)
+class CommandOptions:
+    """How a command is executed. Requests are only shared when these match."""
+
+    timeout: float = DEFAULT_TIMEOUT
+    mode: str = DEFAULT_EXECUTION_MODE
+    max_output: int = DEFAULT_MAX_OUTPUT_SIZE * 1024
+    kill_on_overflow: bool = False
+    limits: ResourceLimits = ResourceLimits()
+    remote: RemoteHost = RemoteHost()
+    source: str = DEFAULT_SOURCE_TYPE
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> CommandOptions:
+        """Build the options from a config entry's data."""
+        return cls(
+            timeout=config.get(CONF_TIMEOUT, DEFAULT_TIMEOUT),
+            mode=config.get(CONF_EXECUTION_MODE, DEFAULT_EXECUTION_MODE),
+            max_output=config.get(CONF_MAX_OUTPUT_SIZE, DEFAULT_MAX_OUTPUT_SIZE) * 1024,
+            kill_on_overflow=config.get(CONF_KILL_ON_OVERFLOW, False),
+            limits=ResourceLimits.from_config(config),
+            remote=RemoteHost.from_config(config),
+            source=config.get(CONF_SOURCE_TYPE, DEFAULT_SOURCE_TYPE),
+        )
+
+
+@dataclass(frozen=True)
+class CommandResult:
+    """Result of a single command execution.
+
+    ``stdout`` holds at most ``max_output`` bytes and ``stderr`` only its last
+    bytes; ``truncated`` is set when stdout was cut short. The sizes count
+    every byte the command wrote. ``spawn_time`` is the time taken to start
+    the process and ``run_time`` the time from getting a slot to finishing.
+    """
+
+    stdout: bytes
+    stderr: bytes
+    returncode: int | None
+    timed_out: bool = False
+    truncated: bool = False
+    queue_wait: float = 0.0
+    spawn_time: float = 0.0
+    run_time: float = 0.0
+    stdout_size: int = 0
+    stderr_size: int = 0
+    finished: float = field(default_factory=time.monotonic)
+
+
+class PriorityLimiter:
+    """Limit concurrent executions, admitting waiters by priority then FIFO."""
+
+    def __init__(self, limit: int) -> None:
+        """Initialize the limiter."""
+        self._limit = limit
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+
+    @property
+    def limit(self) -> int:
+        """Return the maximum number of concurrent executions."""
+        return self._limit
+
+    @limit.setter
+    def limit(self, value: int) -> None:
+        """Change the limit, admitting waiters if it was raised."""
+        self._limit = value
+        while self._active < self._limit and self._wake_next():
+            self._active += 1
+
+    @property
+    def active(self) -> int:
+        """Return the number of running executions."""
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        """Return the number of waiting executions."""
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    async def acquire(self, priority: int = DEFAULT_PRIORITY) -> None:
+        """Wait for a free slot. Higher priority values are admitted first."""
+        if self._active < self._limit and not self.queued:
+            self._active += 1
+            return
+
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._counter), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            # 취소 직전에 슬롯을 넘겨받았다면 다음 대기자에게 돌려줌
+            if fut.done() and not fut.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Release a slot, handing it to the next waiter if any."""
+        if self._active > self._limit or not self._wake_next():
+            self._active -= 1
+
+    def _wake_next(self) -> bool:
+        """Hand a slot to the next live waiter."""
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return True
+        return False
+
+
+class CommandExecutor:
+    """Run shell commands on behalf of every Run Command entry.
+
+    Concurrent requests for the same rendered command (and options) are
+    coalesced into a single subprocess whose result is handed to every
+    waiter. Results can optionally be reused for a short time afterwards.
+    The number of simultaneously running commands is capped integration
+    wide; queued commands are started by entry priority, then in order.
+    Commands run in a freshly spawned shell, directly as an argv without a
+    shell (exec mode, or auto mode when no shell syntax is used), or on a
+    small pool of long-lived shells in persistent mode. In batch mode,
+    commands requested within ``BATCH_WINDOW`` of each other run together
+    in one shell that takes a single slot. Commands for a remote host run
+    over a pooled, multiplexed SSH connection to that host, whatever the
+    mode. Every command gets its own process group, which is killed as a
+    whole when it times out. File sources are read without a process.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    ) -> None:
+        """Initialize the executor."""
+        self.hass = hass
+        self.limiter = PriorityLimiter(max_concurrency)
+        self._inflight: dict[
+            tuple[str, CommandOptions], asyncio.Task[CommandResult]
+        ] = {}
+        self._cache: dict[
+            tuple[str, CommandOptions], tuple[CommandResult, float]
+        ] = {}
+        self._shell_pool = ShellWorkerPool(SHELL_WORKER_POOL_SIZE, self._async_kill)
+        self._batch: list[
+            tuple[str, CommandOptions, int, float, asyncio.Future[CommandResult]]
+        ] = []
+        self._batch_timer: asyncio.TimerHandle | None = None
+        self._batch_tasks: set[asyncio.Task[None]] = set()
+        self._remote = RemoteConnections()
+        self._files = FileReader()
+        self._processes: set[asyncio.subprocess.Process] = set()
+        self.killed_processes = 0
+        self.leaked_processes = 0
+
+    @property
+    def running_processes(self) -> int:
+        """Return the number of tracked processes still running."""
+        return len(self._processes)
+
+    def register_process(
+        self, proc: asyncio.subprocess.Process
+    ) -> Callable[[], None]:
+        """Track a process so it is killed on shutdown.
+
+        Returns a callback that stops tracking it.
+        """
+        self._processes.add(proc)
+        return lambda: self._processes.discard(proc)
+
+    async def _async_kill(self, proc: asyncio.subprocess.Process) -> None:
+        """Terminate a process group and count it."""
+        self.killed_processes += 1
+        if await async_kill_group(proc):
+            self.leaked_processes += 1
+            _LOGGER.warning(
+                "SIGKILL 후에도 종료되지 않은 프로세스가 있습니다 (PID %s)", proc.pid
+            )
+
+    async def async_run(
+        self,
+        command: str,
+        options: CommandOptions,
+        max_age: float = 0,
+        priority: int = DEFAULT_PRIORITY,
+    ) -> CommandResult:
+        """Run a command, sharing the execution with identical requests.
+
+        ``max_age`` allows a cached result up to that many seconds old to be
+        returned instead of spawning a new process. When identical requests
+        are coalesced, the priority of the first one decides its queue slot.
+        """
+        key = (command, options)
+        now = time.monotonic()
+
+        if max_age > 0 and (cached := self._cache.get(key)) is not None:
+            result, _ = cached
+            if now - result.finished <= max_age:
+                return result
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self.hass.async_create_background_task(
+                self._async_execute(command, options, priority),
+                f"{DOMAIN} command",
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            _LOGGER.debug("실행 중인 동일 명령어 결과 공유: %s", command)
+
+        # 대기 중인 센서 하나가 취소되어도 공유 실행은 계속되도록 보호
+        result = await asyncio.shield(task)
+
+        if max_age > 0:
+            self._store(key, result, max_age)
+        return result
+
+    def _store(
+        self, key: tuple[str, CommandOptions], result: CommandResult, max_age: float
+    ) -> None:
+        """Cache a result and drop expired entries."""
+        expires = result.finished + max_age
+        if (cached := self._cache.get(key)) is not None and cached[0] is result:
+            expires = max(expires, cached[1])
+        self._cache[key] = (result, expires)
+
+        now = time.monotonic()
+        for stale_key in [k for k, (_, exp) in self._cache.items() if exp < now]:
+            del self._cache[stale_key]
+
+    async def _async_execute(
+        self, command: str, options: CommandOptions, priority: int
+    ) -> CommandResult:
+        """Wait for a free slot, then run the command and collect its output."""
+        if options.source == SOURCE_TYPE_FILE:
+            if not options.remote:
+                return await self._async_read_files(command, options)
+            # 원격 호스트의 파일은 SSH 연결에서 cat으로 읽음
+            command = shlex.join(["cat", "--", *parse_paths(command)])
+        if options.remote:
+            return await self._async_run_remote(command, options, priority)
+        if options.mode == EXECUTION_MODE_BATCH:
+            return await self._async_run_batched(command, options, priority)
+
+        queued_at = time.monotonic()
+        await self.limiter.acquire(priority)
+        started = time.monotonic()
+
+        try:
+            if options.mode == EXECUTION_MODE_PERSISTENT:
+                stdout, stderr, returncode, stdout_size, stderr_size = (
+                    await self._shell_pool.async_run(
+                        options.limits.wrap_command(command),
+                        options.timeout,
+                        options.max_output,
+                    )
+                )
+                result = CommandResult(
+                    stdout,
+                    stderr,
+                    returncode,
+                    truncated=stdout_size > options.max_output,
+                    stdout_size=stdout_size,
+                    stderr_size=stderr_size,
+                )
+            else:
+                argv = _command_argv(command, options)
+                result = await self._async_spawn(command, argv, options)
+        except asyncio.TimeoutError:
+            # 상주 셸은 시간 초과 시 _async_kill로 프로세스 그룹째 종료되어 집계됨
+            result = CommandResult(b"", b"", None, timed_out=True)
+        finally:
+            self.limiter.release()
+
+        return replace(
+            result,
+            queue_wait=started - queued_at,
+            run_time=time.monotonic() - started,
+        )
+
+    async def _async_read_files(
+        self, command: str, options: CommandOptions
+    ) -> CommandResult:
+        """Read the files of a file source (one path per line of ``command``).
+
+        The files are read in an executor thread through descriptors kept
+        open between reads. No process is started, so no slot is taken.
+        """
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(options.timeout):
+                stdout, stderr, returncode, stdout_size = (
+                    await self.hass.async_add_executor_job(
+                        self._files.read, parse_paths(command), options.max_output
+                    )
+                )
+        except asyncio.TimeoutError:
+            return CommandResult(
+                b"", b"", None, timed_out=True, run_time=time.monotonic() - started
+            )
+        return CommandResult(
+            stdout,
+            stderr,
+            returncode,
+            truncated=stdout_size > options.max_output,
+            run_time=time.monotonic() - started,
+            stdout_size=stdout_size,
+            stderr_size=len(stderr),
+        )
+
+    async def _async_run_remote(
+        self, command: str, options: CommandOptions, priority: int
+    ) -> CommandResult:
+        """Run the command on its remote host over the pooled SSH connection.
+
+        Resource limits are applied on the remote host. While the host is
+        in reconnect backoff the command fails right away.
+        """
+        remote = options.remote
+        if (retry_in := self._remote.retry_in(remote)) > 0:
+            return CommandResult(
+                b"",
+                f"SSH 재연결 대기 중 ({retry_in:.0f}초 남음): {remote.host}".encode(),
+                SSH_CONNECTION_ERROR,
+            )
+
+        queued_at = time.monotonic()
+        async with self._remote.channels(remote):
+            await self.limiter.acquire(priority)
+            started = time.monotonic()
+            try:
+                argv = await self.async_remote_argv(
+                    remote, options.limits.wrap_command(command)
+                )
+                result = await self._async_spawn(
+                    command, argv, replace(options, limits=ResourceLimits())
+                )
+            except asyncio.TimeoutError:
+                result = CommandResult(b"", b"", None, timed_out=True)
+            finally:
+                self.limiter.release()
+
+        # 시간 초과는 명령어 때문일 수 있으므로 연결 실패로 보지 않음
+        if not result.timed_out:
+            self._remote.record(remote, result.returncode != SSH_CONNECTION_ERROR)
+        return replace(
+            result,
+            queue_wait=started - queued_at,
+            run_time=time.monotonic() - started,
+        )
+
+    async def async_remote_argv(self, remote: RemoteHost, command: str) -> list[str]:
+        """Return the argv running ``command`` over the host's pooled connection."""
+        return remote.argv(await self._remote.async_control_dir(), command)
+
+    async def _async_run_batched(
+        self, command: str, options: CommandOptions, priority: int
+    ) -> CommandResult:
+        """Add the command to the next batch and wait for its result."""
+        fut: asyncio.Future[CommandResult] = self.hass.loop.create_future()
+        self._batch.append((command, options, priority, time.monotonic(), fut))
+        if len(self._batch) >= BATCH_MAX_SIZE:
+            self._flush_batch()
+        elif self._batch_timer is None:
+            self._batch_timer = self.hass.loop.call_later(
+                BATCH_WINDOW, self._flush_batch
+            )
+        return await fut
+
+    def _flush_batch(self) -> None:
+        """Start running the collected commands as one batch."""
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        items, self._batch = self._batch, []
+        if not items:
+            return
+        task = self.hass.async_create_background_task(
+            self._async_execute_batch(items), f"{DOMAIN} batch"
+        )
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _async_execute_batch(
+        self,
+        items: list[
+            tuple[str, CommandOptions, int, float, asyncio.Future[CommandResult]]
+        ],
+    ) -> None:
+        """Run a batch in one shell and hand each command its own result."""
+        try:
+            await self.limiter.acquire(max(priority for _, _, priority, _, _ in items))
+        except asyncio.CancelledError:
+            for *_, fut in items:
+                fut.cancel()
+            raise
+        started = time.monotonic()
+        _LOGGER.debug("명령어 %s개를 한 셸에서 배치 실행", len(items))
+
+        try:
+            results = await async_run_batch(
+                [
+                    BatchCommand(
+                        options.limits.wrap_command(command),
+                        options.timeout,
+                        options.max_output,
+                        options.kill_on_overflow,
+                    )
+                    for command, options, _, _, _ in items
+                ],
+                self.register_process,
+            )
+        except asyncio.TimeoutError:
+            self.killed_processes += 1
+            results = [None] * len(items)
+        except asyncio.CancelledError:
+            for *_, fut in items:
+                fut.cancel()
+            raise
+        except Exception as err:  # pylint: disable=broad-except
+            for *_, fut in items:
+                if not fut.done():
+                    fut.set_exception(err)
+            return
+        finally:
+            self.limiter.release()
+
+        run_time = time.monotonic() - started
+        for (_, options, _, queued_at, fut), batch_result in zip(items, results):
+            if fut.done():
+                continue
+            # 다른 명령어와 관계없이 각 명령어의 시간 초과/실패를 따로 보고
+            if batch_result is None or batch_result.timed_out:
+                if batch_result is not None:
+                    self.killed_processes += 1
+                result = CommandResult(b"", b"", None, timed_out=True)
+            else:
+                result = CommandResult(
+                    batch_result.stdout,
+                    batch_result.stderr,
+                    batch_result.returncode,
+                    truncated=batch_result.stdout_size > options.max_output,
+                    stdout_size=batch_result.stdout_size,
+                    stderr_size=batch_result.stderr_size,
+                )
+            fut.set_result(
+                replace(result, queue_wait=started - queued_at, run_time=run_time)
+            )
+
+    async def _async_spawn(
+        self, command: str, argv: list[str] | None, options: CommandOptions
+    ) -> CommandResult:
+        """Spawn the command (in a shell unless argv is given) and wait for it.
+
+        Resource limits are applied by wrapping the command or argv.
+        """
+        spawn_started = time.monotonic()
+        if argv:
+            proc = await asyncio.create_subprocess_exec(
+                *options.limits.wrap_argv(argv),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+            )
+        else:
+            proc = await asyncio.create_subprocess_shell(
+                options.limits.wrap_command(command),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+            )
+        spawn_time = time.monotonic() - spawn_started
+        assert proc.stdout and proc.stderr
+
+        def _on_overflow() -> None:
+            """Kill the process if configured to stop at the output limit."""
+            if options.kill_on_overflow:
+                _LOGGER.warning(
+                    "출력 크기 제한(%s바이트) 초과로 명령어 종료: %s",
+                    options.max_output,
+                    command,
+                )
+                if signal_group(proc, signal.SIGKILL):
+                    self.killed_processes += 1
+
+        unregister = self.register_process(proc)
+        try:
+            async with asyncio.timeout(options.timeout):
+                (stdout, stdout_size), (stderr, stderr_size), _ = await asyncio.gather(
+                    async_read_head(proc.stdout, options.max_output, _on_overflow),
+                    async_read_tail(proc.stderr, STDERR_TAIL_SIZE),
+                    proc.wait(),
+                )
+        except asyncio.TimeoutError:
+            # 셸만 종료하면 파이프라인이나 자식 프로세스가 남으므로 그룹 전체 종료
+            await self._async_kill(proc)
+            raise
+        except asyncio.CancelledError:
+            # 종료 시 취소된 경우 (집계는 async_shutdown에서)
+            signal_group(proc, signal.SIGKILL)
+            raise
+        finally:
+            unregister()
+
+        return CommandResult(
+            stdout,
+            stderr,
+            proc.returncode,
+            truncated=stdout_size > options.max_output,
+            spawn_time=spawn_time,
+            stdout_size=stdout_size,
+            stderr_size=stderr_size,
+        )
+
+    async def async_shutdown(self) -> None:
+        """Cancel running commands, stop shell workers and clear cached results.
+
+        Processes that are still tracked afterwards, such as streams, are
+        terminated with their process groups.
+        """
+        for task in [*self._inflight.values(), *self._batch_tasks]:
+            task.cancel()
+        self._inflight.clear()
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        for *_, fut in self._batch:
+            fut.cancel()
+        self._batch.clear()
+        self._cache.clear()
+        self._shell_pool.close()
+        await self._remote.async_close()
+        await self.hass.async_add_executor_job(self._files.close)
+
+        processes = [proc for proc in self._processes if proc.returncode is None]
+        self._processes.clear()
+        if processes:
+            _LOGGER.debug("실행 중인 프로세스 %s개 종료", len(processes))
+            await asyncio.gather(*(self._async_kill(proc) for proc in processes))
+
+
+def _command_argv(command: str, options: CommandOptions) -> list[str] | None:
+    """Return the argv to execute without a shell, or None to use a shell."""
+    if options.mode == EXECUTION_MODE_EXEC:
+        return shlex.split(command)
+    if options.mode == EXECUTION_MODE_AUTO:
+        return split_command(command)
+    return None
+
+
+def split_command(command: str) -> list[str] | None:
+    """Split a command into argv if it can run without a shell."""
+    if SHELL_METACHARACTERS.intersection(command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv or argv[0] in SHELL_BUILTINS or "=" in argv[0]:
+        return None
+    return argv
+
+
+def async_get_executor(hass: HomeAssistant) -> CommandExecutor:
+    """Return the shared executor, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (executor := domain_data.get(DATA_EXECUTOR)) is None:
+        executor = domain_data[DATA_EXECUTOR] = CommandExecutor(hass)
+    return executor
@@ -0,0 +1,170 @@
+"""Native value extractors for Run Command integration.
+
+Extractors pull the state out of command output without rendering a Jinja
+template. They are compiled once from the entry's configuration and return
+None when the output does not contain the value.
+"""
+from __future__ import annotations
+
+import csv
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from .const import (
+    EXTRACTOR_CSV,
+    EXTRACTOR_JSONPATH,
+    EXTRACTOR_KEY_VALUE,
+    EXTRACTOR_LINE_FIELD,
+    EXTRACTOR_NONE,
+    EXTRACTOR_REGEX,
+)
+
+JSONPATH_TOKEN_RE = re.compile(
+    r"\.([^.\[\]]+)|\[(-?\d+)\]|\[(['\"])(.*?)\3\]"
+)
+LINE_FIELD_RE = re.compile(r"^(-?\d+)(?::(-?\d+))?$")
+
+
+@dataclass(frozen=True)
+class Extractor:
+    """A compiled extractor.
+
+    ``uses_json`` is set when the extractor reads the parsed ``value_json``
+    instead of the raw output.
+    """
+
+    func: Callable[[str, Any], Any]
+    uses_json: bool = False
+
+    def __call__(self, value: str, value_json: Any) -> Any:
+        """Return the extracted value, or None if it was not found."""
+        try:
+            return self.func(value, value_json)
+        except (IndexError, KeyError, TypeError, ValueError, csv.Error):
+            return None
+
+
+def compile_extractor(kind: str, expression: str) -> Extractor | None:
+    """Compile an extractor; raise ValueError if the expression is invalid."""
+    if not kind or kind == EXTRACTOR_NONE:
+        return None
+    expression = expression.strip()
+    if not expression:
+        raise ValueError("추출 표현식을 입력해야 합니다")
+    if kind == EXTRACTOR_JSONPATH:
+        return Extractor(_compile_jsonpath(expression), uses_json=True)
+    if kind == EXTRACTOR_REGEX:
+        return Extractor(_compile_regex(expression))
+    if kind == EXTRACTOR_CSV:
+        return Extractor(_compile_csv(expression))
+    if kind == EXTRACTOR_KEY_VALUE:
+        return Extractor(_compile_key_value(expression))
+    if kind == EXTRACTOR_LINE_FIELD:
+        return Extractor(_compile_line_field(expression))
+    raise ValueError(f"알 수 없는 추출 방식: {kind}")
+
+
+def _compile_jsonpath(expression: str) -> Callable[[str, Any], Any]:
+    """Compile a JSONPath subset: ``$.a.b[0]['c d']`` (``$`` is optional)."""
+    path = expression[1:] if expression.startswith("$") else expression
+    if path and path[0] not in ".[":
+        path = "." + path
+
+    steps: list[str | int] = []
+    position = 0
+    while position < len(path):
+        if not (match := JSONPATH_TOKEN_RE.match(path, position)):
+            raise ValueError(f"지원하지 않는 JSONPath 표현식: {expression}")
+        name, index, _, quoted = match.groups()
+        if index is not None:
+            steps.append(int(index))
+        elif quoted is not None:
+            steps.append(quoted)
+        else:
+            steps.append(name)
+        position = match.end()
+
+    def extract(value: str, value_json: Any) -> Any:
+        current = value_json
+        for step in steps:
+            if isinstance(current, list):
+                current = current[int(step)]
+            elif isinstance(current, dict):
+                current = current[step if isinstance(step, str) else str(step)]
+            else:
+                return None
+        return current
+
+    return extract
+
+
+def _compile_regex(expression: str) -> Callable[[str, Any], Any]:
+    """Compile a regex; the value is group ``value``, group 1 or the whole match."""
+    try:
+        pattern = re.compile(expression, re.MULTILINE)
+    except re.error as err:
+        raise ValueError(f"유효하지 않은 정규식: {err}") from err
+    if "value" in pattern.groupindex:
+        group: int | str = "value"
+    else:
+        group = 1 if pattern.groups else 0
+
+    def extract(value: str, value_json: Any) -> Any:
+        if match := pattern.search(value):
+            return match.group(group)
+        return None
+
+    return extract
+
+
+def _compile_csv(expression: str) -> Callable[[str, Any], Any]:
+    """Compile a CSV column lookup by index or by header name.
+
+    The value is taken from the last row; a header name is looked up in
+    the first row.
+    """
+    column = int(expression) if expression.lstrip("-").isdigit() else expression
+
+    def extract(value: str, value_json: Any) -> Any:
+        rows = [row for row in csv.reader(value.splitlines()) if row]
+        if isinstance(column, int):
+            return rows[-1][column].strip()
+        if len(rows) < 2:
+            return None
+        header = [name.strip() for name in rows[0]]
+        return rows[-1][header.index(column)].strip()
+
+    return extract
+
+
+def _compile_key_value(expression: str) -> Callable[[str, Any], Any]:
+    """Compile a lookup of ``key=value`` or ``key: value`` lines."""
+    pattern = re.compile(
+        rf"^\s*{re.escape(expression)}\s*[=:]\s*(.*?)\s*$", re.MULTILINE
+    )
+
+    def extract(value: str, value_json: Any) -> Any:
+        if match := pattern.search(value):
+            return match.group(1).strip("\"'")
+        return None
+
+    return extract
+
+
+def _compile_line_field(expression: str) -> Callable[[str, Any], Any]:
+    """Compile ``line`` or ``line:field`` (0-based, negative from the end).
+
+    Fields are separated by whitespace.
+    """
+    if not (match := LINE_FIELD_RE.match(expression)):
+        raise ValueError("줄/필드 번호는 '줄' 또는 '줄:필드' 형식이어야 합니다")
+    line = int(match.group(1))
+    field = int(match.group(2)) if match.group(2) is not None else None
+
+    def extract(value: str, value_json: Any) -> Any:
+        text = value.splitlines()[line]
+        return text.strip() if field is None else text.split()[field]
+
+    return extract
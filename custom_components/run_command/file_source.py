@@ -0,0 +1,309 @@
+"""Subprocess-free file source for Run Command integration."""
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import errno
+import logging
+import os
+import stat
+import struct
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from typing import NamedTuple
+
+from .const import FILE_MAX_OPEN
+from .shell_worker import READ_CHUNK_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+# 커널이 읽을 때마다 내용을 만들어 내므로 inotify 알림이 오지 않는 파일 시스템
+NO_NOTIFY_PREFIXES = ("/proc/", "/sys/")
+
+# inotify 상수 (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def parse_paths(text: str) -> list[str]:
+    """Return the paths of a file source, one per non-empty line."""
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+class FileReadResult(NamedTuple):
+    """Contents of the files of a file source, like the output of ``cat``."""
+
+    stdout: bytes
+    stderr: bytes
+    returncode: int
+    stdout_size: int
+
+
+class _OpenFile:
+    """A cached file descriptor; the lock keeps it from being closed mid-read."""
+
+    def __init__(self, fd: int) -> None:
+        """Initialize the entry."""
+        self.fd = fd
+        self.lock = threading.Lock()
+
+
+def _pread_all(fd: int, limit: int) -> bytes:
+    """Read up to ``limit`` bytes from the start of a file."""
+    chunks: list[bytes] = []
+    offset = 0
+    while offset < limit:
+        chunk = os.pread(fd, min(READ_CHUNK_SIZE, limit - offset), offset)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        offset += len(chunk)
+    return b"".join(chunks)
+
+
+def _read_once(path: str, limit: int) -> bytes:
+    """Open, read and close a file that cannot be read with ``pread``."""
+    with open(path, "rb", buffering=0) as file:
+        return file.read(limit)
+
+
+def _replaced(path: str, info: os.stat_result) -> bool:
+    """Return True if ``path`` no longer names the file described by ``info``."""
+    current = os.stat(path)
+    return (current.st_dev, current.st_ino) != (info.st_dev, info.st_ino)
+
+
+class FileReader:
+    """Read files through file descriptors kept open between reads.
+
+    Every read is a ``pread`` from offset 0 on the cached descriptor, so a
+    sysfs or procfs file is regenerated by the kernel without an open and
+    close per poll. A regular file is checked against its path on every
+    read, so a descriptor whose file was deleted, or renamed away and
+    recreated (log rotation), is reopened. At most ``max_open`` descriptors
+    are kept; the least recently used one is closed first. Reads block, so
+    run them in an executor thread.
+    """
+
+    def __init__(self, max_open: int = FILE_MAX_OPEN) -> None:
+        """Initialize the reader."""
+        self.max_open = max_open
+        self._files: OrderedDict[str, _OpenFile] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, path: str) -> _OpenFile:
+        """Return the cached descriptor of a path, opening it on first use."""
+        with self._lock:
+            if (entry := self._files.get(path)) is not None:
+                self._files.move_to_end(path)
+                return entry
+        entry = _OpenFile(os.open(path, os.O_RDONLY | os.O_CLOEXEC))
+        with self._lock:
+            if (existing := self._files.get(path)) is not None:
+                os.close(entry.fd)
+                return existing
+            self._files[path] = entry
+            evicted = (
+                self._files.popitem(last=False)[1]
+                if len(self._files) > self.max_open
+                else None
+            )
+        if evicted is not None:
+            with evicted.lock:
+                os.close(evicted.fd)
+                evicted.fd = -1
+        return entry
+
+    def _read_one(self, path: str, limit: int) -> bytes:
+        """Read up to ``limit`` bytes of one file."""
+        entry = self._get(path)
+        with entry.lock:
+            if entry.fd < 0:
+                # 다른 스레드가 방금 닫은 경우
+                return _read_once(path, limit)
+            try:
+                info = os.fstat(entry.fd)
+                if info.st_nlink == 0 or (
+                    stat.S_ISREG(info.st_mode) and _replaced(path, info)
+                ):
+                    # 삭제되었거나 다른 파일로 교체됨
+                    raise FileNotFoundError
+                return _pread_all(entry.fd, limit)
+            except OSError:
+                os.close(entry.fd)
+                entry.fd = -1
+                with self._lock:
+                    if self._files.get(path) is entry:
+                        del self._files[path]
+        # 다시 열어서 한 번 더 시도 (pread를 지원하지 않는 파일은 일반 읽기)
+        try:
+            return self._read_one_fresh(path, limit)
+        except OSError as err:
+            if err.errno == errno.ESPIPE:
+                return _read_once(path, limit)
+            raise
+
+    def _read_one_fresh(self, path: str, limit: int) -> bytes:
+        """Reopen a file and read it from its new descriptor."""
+        entry = self._get(path)
+        with entry.lock:
+            if entry.fd < 0:
+                return _read_once(path, limit)
+            return _pread_all(entry.fd, limit)
+
+    def read(self, paths: Sequence[str], max_output: int) -> FileReadResult:
+        """Read ``paths`` in order, like ``cat``.
+
+        Output past ``max_output`` bytes is not read; a file that cannot be
+        read is reported on stderr and makes the return code 1.
+        """
+        chunks: list[bytes] = []
+        errors: list[str] = []
+        size = 0
+        for path in paths:
+            if size > max_output:
+                break
+            try:
+                data = self._read_one(path, max_output + 1 - size)
+            except OSError as err:
+                errors.append(f"{path}: {err.strerror or err}")
+                continue
+            chunks.append(data)
+            size += len(data)
+        stdout = b"".join(chunks)
+        return FileReadResult(
+            stdout[:max_output],
+            "\n".join(errors).encode(),
+            1 if errors else 0,
+            size,
+        )
+
+    def close(self) -> None:
+        """Close every cached descriptor."""
+        with self._lock:
+            files = list(self._files.values())
+            self._files.clear()
+        for entry in files:
+            with entry.lock:
+                if entry.fd >= 0:
+                    os.close(entry.fd)
+                    entry.fd = -1
+
+
+def _load_inotify() -> ctypes.CDLL | None:
+    """Return libc if it provides inotify, else None."""
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FileWatcher:
+    """Call ``on_change`` when one of the watched files is written or replaced.
+
+    inotify watches are placed on the files' parent directories, so a file
+    that is replaced by a rename or created later is still noticed. Files
+    under ``/proc`` and ``/sys`` never report changes and are not watched.
+    """
+
+    _libc: ctypes.CDLL | None = None
+    _libc_loaded = False
+
+    def __init__(self, on_change: Callable[[], None]) -> None:
+        """Initialize the watcher."""
+        self._on_change = on_change
+        self._paths: tuple[str, ...] = ()
+        self._fd = -1
+        self._watches: dict[int, set[str]] = {}
+
+    @classmethod
+    def _inotify(cls) -> ctypes.CDLL | None:
+        """Return libc with inotify, loading it on first use."""
+        if not cls._libc_loaded:
+            cls._libc_loaded = True
+            cls._libc = _load_inotify()
+        return cls._libc
+
+    @property
+    def watching(self) -> bool:
+        """Return True if at least one file is watched."""
+        return bool(self._watches)
+
+    def set_paths(self, paths: Iterable[str]) -> bool:
+        """Watch ``paths`` instead of the current ones; return ``watching``."""
+        paths = tuple(paths)
+        if paths == self._paths:
+            return self.watching
+        self.close()
+        self._paths = paths
+
+        directories: dict[str, set[str]] = {}
+        for path in paths:
+            path = os.path.abspath(path)
+            if path.startswith(NO_NOTIFY_PREFIXES):
+                continue
+            directory, name = os.path.split(path)
+            directories.setdefault(directory, set()).add(name)
+        if not directories or (libc := self._inotify()) is None:
+            return False
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            _LOGGER.warning("inotify를 사용할 수 없습니다: %s", os.strerror(ctypes.get_errno()))
+            return False
+        self._fd = fd
+        for directory, names in directories.items():
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                _LOGGER.warning(
+                    "파일 변경 감시 실패 (%s): %s",
+                    directory,
+                    os.strerror(ctypes.get_errno()),
+                )
+                continue
+            self._watches[wd] = names
+        if not self._watches:
+            self.close()
+            self._paths = paths
+            return False
+        asyncio.get_running_loop().add_reader(fd, self._read_events)
+        return True
+
+    def _read_events(self) -> None:
+        """Read pending inotify events and report a change of a watched file."""
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, READ_CHUNK_SIZE)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & IN_Q_OVERFLOW or name in self._watches.get(wd, ()):
+                    changed = True
+        if changed:
+            self._on_change()
+
+    def close(self) -> None:
+        """Stop watching."""
+        if self._fd >= 0:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = -1
+        self._watches.clear()
+        self._paths = ()
@@ -0,0 +1,99 @@
+"""Resource limits for commands of Run Command integration."""
+from __future__ import annotations
+
+import shlex
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from .const import (
+    CONF_CGROUP,
+    CONF_CPU_TIME_LIMIT,
+    CONF_IO_CLASS,
+    CONF_MAX_OPEN_FILES,
+    CONF_MEMORY_LIMIT,
+    CONF_NICE,
+    IO_CLASS_BEST_EFFORT,
+    IO_CLASS_IDLE,
+    IO_CLASS_NONE,
+)
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+# ionice 인자 (best-effort는 가장 낮은 우선순위 사용)
+IONICE_ARGS = {
+    IO_CLASS_BEST_EFFORT: ["ionice", "-c", "2", "-n", "7"],
+    IO_CLASS_IDLE: ["ionice", "-c", "3"],
+}
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    """Scheduling priority, rlimits and cgroup applied to a command.
+
+    The limits are applied by a short shell preamble (``ulimit``, a write
+    to ``cgroup.procs``) followed by ``exec nice ionice`` before the command
+    itself starts, so every process it spawns inherits them. Zero or empty
+    values leave the corresponding limit unchanged.
+    """
+
+    nice: int = 0
+    io_class: str = IO_CLASS_NONE
+    memory: int = 0  # MiB, RLIMIT_AS
+    cpu_time: int = 0  # 초, RLIMIT_CPU
+    max_files: int = 0  # RLIMIT_NOFILE
+    cgroup: str = ""
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> ResourceLimits:
+        """Build the limits from a config entry's data."""
+        return cls(
+            nice=config.get(CONF_NICE, 0),
+            io_class=config.get(CONF_IO_CLASS, IO_CLASS_NONE),
+            memory=config.get(CONF_MEMORY_LIMIT, 0),
+            cpu_time=config.get(CONF_CPU_TIME_LIMIT, 0),
+            max_files=config.get(CONF_MAX_OPEN_FILES, 0),
+            cgroup=(config.get(CONF_CGROUP) or "").strip(),
+        )
+
+    def __bool__(self) -> bool:
+        """Return True if any limit is set."""
+        return bool(self._preamble() or self._prefix())
+
+    def _preamble(self) -> list[str]:
+        """Return the shell steps that apply rlimits and the cgroup."""
+        steps = []
+        if self.cpu_time:
+            steps.append(f"ulimit -t {self.cpu_time}")
+        if self.memory:
+            steps.append(f"ulimit -v {self.memory * 1024}")
+        if self.max_files:
+            steps.append(f"ulimit -n {self.max_files}")
+        if self.cgroup:
+            path = self.cgroup
+            if not path.startswith("/"):
+                path = f"{CGROUP_ROOT}/{path}"
+            steps.append(f"echo $$ > {shlex.quote(path + '/cgroup.procs')}")
+        return steps
+
+    def _prefix(self) -> list[str]:
+        """Return the argv prefix that lowers CPU and I/O priority."""
+        prefix = []
+        if self.nice:
+            prefix.extend(["nice", "-n", str(self.nice)])
+        prefix.extend(IONICE_ARGS.get(self.io_class, []))
+        return prefix
+
+    def wrap_command(self, command: str) -> str:
+        """Return a shell command running ``command`` under the limits."""
+        if not self:
+            return command
+        argv = [*self._prefix(), "/bin/sh", "-c", command]
+        return " && ".join([*self._preamble(), f"exec {shlex.join(argv)}"])
+
+    def wrap_argv(self, argv: list[str]) -> list[str]:
+        """Return an argv running ``argv`` under the limits."""
+        if not (preamble := self._preamble()):
+            return [*self._prefix(), *argv]
+        script = " && ".join([*preamble, 'exec "$@"'])
+        return ["/bin/sh", "-c", script, "sh", *self._prefix(), *argv]
@@ -0,0 +1,126 @@
+"""Persisted last-output cache for Run Command integration."""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, OUTPUT_CACHE_MAX_SIZE, OUTPUT_CACHE_SAVE_DELAY
+from .executor import CommandOptions
+
+STORAGE_VERSION = 1
+
+
+def output_key(command: str, options: CommandOptions) -> str:
+    """Return a key identifying the output of a rendered command and its options."""
+    return hashlib.blake2b(repr((command, options)).encode(), digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedOutput:
+    """The last successful output of an entry's command.
+
+    ``key`` identifies the command and options that produced it.
+    """
+
+    key: str
+    raw: str
+    returncode: int
+    updated: datetime
+
+
+class OutputCache:
+    """Keep the last successful output of an entry's command in a Store.
+
+    Writes are delayed by ``OUTPUT_CACHE_SAVE_DELAY`` seconds so that a
+    command polled every few seconds causes at most one write per delay.
+    Updates while a write is pending do not postpone it (that write stores
+    the newest output), so the store is written at least once per delay
+    even when polls come faster; Home Assistant flushes a pending write
+    when it stops. Output larger than ``OUTPUT_CACHE_MAX_SIZE`` characters
+    is not cached.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, ttl: float) -> None:
+        """Initialize the cache."""
+        self.ttl = ttl
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}"
+        )
+        self._output: CachedOutput | None = None
+        self._loaded = False
+        self._save_pending = False
+
+    def get(self, key: str) -> CachedOutput | None:
+        """Return the output kept in memory if it is still fresh.
+
+        Output of another command or other options (``key``) is ignored.
+        """
+        if (
+            self.ttl <= 0
+            or self._output is None
+            or self._output.key != key
+            or dt_util.now() - self._output.updated > timedelta(seconds=self.ttl)
+        ):
+            return None
+        return self._output
+
+    async def async_load(self, key: str) -> CachedOutput | None:
+        """Load the stored output; return it if it is fresh and matches ``key``."""
+        if not self._loaded and self.ttl > 0:
+            self._loaded = True
+            if (data := await self._store.async_load()) is not None and self._output is None:
+                try:
+                    self._output = CachedOutput(
+                        data["key"],
+                        data["raw"],
+                        data["returncode"],
+                        dt_util.parse_datetime(data["updated"]) or dt_util.now(),
+                    )
+                except (KeyError, TypeError):
+                    self._output = None
+        return self.get(key)
+
+    @callback
+    def async_record(
+        self, key: str, raw: str, returncode: int, updated: datetime
+    ) -> None:
+        """Remember a successful output of the command ``key`` and schedule a write."""
+        if self.ttl <= 0 or len(raw) > OUTPUT_CACHE_MAX_SIZE:
+            return
+        self._loaded = True
+        self._output = CachedOutput(key, raw, returncode, updated)
+        # 다시 예약하면 쓰기가 계속 미뤄지므로 대기 중인 쓰기가 없을 때만 예약
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data, OUTPUT_CACHE_SAVE_DELAY)
+
+    @callback
+    def async_touch(self, updated: datetime) -> None:
+        """Mark the cached output as seen again (the output did not change)."""
+        if self._output is not None:
+            self.async_record(
+                self._output.key, self._output.raw, self._output.returncode, updated
+            )
+
+    @callback
+    def _data(self) -> dict[str, Any]:
+        """Return the data to store (called when the write happens)."""
+        assert self._output is not None
+        self._save_pending = False
+        return {
+            "key": self._output.key,
+            "raw": self._output.raw,
+            "returncode": self._output.returncode,
+            "updated": self._output.updated.isoformat(),
+        }
+
+
+async def async_remove_output_cache(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete the stored output of a removed entry."""
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}").async_remove()
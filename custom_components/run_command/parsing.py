@@ -0,0 +1,55 @@
+"""Output parsing helpers for Run Command integration."""
+from __future__ import annotations
+
+import json
+import re
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson는 Home Assistant와 함께 설치됨
+    orjson = None
+
+from .extract import Extractor
+
+# JSON 문서가 시작될 수 있는 첫 글자 (json 모듈이 받아들이는 NaN, Infinity 포함)
+JSON_START = frozenset('{["-0123456789tfnNI')
+# orjson은 64비트 범위를 넘는 정수를 float로 바꾸므로 긴 숫자가 있으면 json 모듈 사용
+LONG_NUMBER_RE = re.compile(r"\d{19}")
+
+
+def parse_json(text: str) -> Any:
+    """Parse command output as JSON, returning None if it is not JSON.
+
+    Uses orjson when available and falls back to the json module for what
+    orjson rejects or changes (NaN, Infinity, out-of-range floats and
+    integers beyond 64 bits), so the result matches ``json.loads``. Output
+    that cannot start a JSON document is rejected without decoding it.
+    """
+    if not text or text[0] not in JSON_START:
+        return None
+    if orjson is not None and not LONG_NUMBER_RE.search(text):
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+
+def prepare_output(
+    stdout: bytes, truncated: bool, parse: bool, extractor: Extractor | None
+) -> tuple[str, Any, Any]:
+    """Decode, parse and extract command output.
+
+    Returns the stripped text, the parsed JSON (None unless ``parse``) and
+    the extracted value (None without an extractor). Does not touch Home
+    Assistant state, so it can run in an executor thread for large output.
+    A truncated output may end in a partial character, which is dropped.
+    """
+    raw_result = stdout.decode(errors="ignore" if truncated else "strict").strip()
+    value_json = parse_json(raw_result) if parse else None
+    extracted = extractor(raw_result, value_json) if extractor is not None else None
+    return raw_result, value_json, extracted
@@ -0,0 +1,122 @@
+"""Process group handling for Run Command integration.
+
+Commands are started in their own session, so the shell, the programs it
+starts and their children share one process group that can be signalled
+as a whole.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+from collections.abc import Callable
+
+from .const import KILL_GRACE_TIME
+from .shell_worker import READ_CHUNK_SIZE
+
+GROUP_POLL_INTERVAL = 0.05
+LEAK_CHECK_TIME = 1
+
+
+def signal_group(proc: asyncio.subprocess.Process, sig: int) -> bool:
+    """Send a signal to the process group led by ``proc``.
+
+    Returns False if no process of the group is left.
+    """
+    try:
+        os.killpg(proc.pid, sig)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # 그룹 리더가 이미 회수되고 PID가 재사용된 경우
+        return False
+    return True
+
+
+def _group_running(pgid: int) -> bool:
+    """Return True if a process of the group is running.
+
+    Exited processes that were not reaped yet (zombies) do not count.
+    """
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return True
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as stat_file:
+                stat = stat_file.read()
+        except OSError:
+            continue
+        # 프로세스 이름에 공백이나 괄호가 있을 수 있으므로 마지막 ')' 이후를 나눔
+        fields = stat[stat.rfind(b")") + 2 :].split()
+        if len(fields) > 2 and int(fields[2]) == pgid and fields[0] != b"Z":
+            return True
+    return False
+
+
+async def _async_wait_group(proc: asyncio.subprocess.Process, timeout: float) -> bool:
+    """Wait until every process of the group exited; return False on timeout."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while signal_group(proc, 0) and await loop.run_in_executor(
+        None, _group_running, proc.pid
+    ):
+        if loop.time() >= deadline:
+            return False
+        await asyncio.sleep(GROUP_POLL_INTERVAL)
+    return True
+
+
+async def async_kill_group(
+    proc: asyncio.subprocess.Process, grace: float = KILL_GRACE_TIME
+) -> bool:
+    """Terminate the process group led by ``proc``.
+
+    Sends SIGTERM, then SIGKILL to whatever is left after ``grace`` seconds.
+    Returns True if a process of the group is still alive afterwards.
+    """
+    if not signal_group(proc, signal.SIGTERM):
+        return False
+    if await _async_wait_group(proc, grace):
+        return False
+    signal_group(proc, signal.SIGKILL)
+    return not await _async_wait_group(proc, LEAK_CHECK_TIME)
+
+
+async def async_read_head(
+    reader: asyncio.StreamReader, limit: int, on_overflow: Callable[[], None]
+) -> tuple[bytes, int]:
+    """Read a stream keeping only its first ``limit`` bytes.
+
+    Returns the kept bytes and the total size of the stream. ``on_overflow``
+    is called once when the limit is hit. The rest of the stream is still
+    read and discarded so the writer never blocks on a full pipe.
+    """
+    data = bytearray()
+    size = 0
+    while chunk := await reader.read(READ_CHUNK_SIZE):
+        size += len(chunk)
+        if size - len(chunk) > limit:
+            continue
+        room = limit - len(data)
+        data += chunk[:room]
+        if len(chunk) > room:
+            on_overflow()
+    return bytes(data), size
+
+
+async def async_read_tail(
+    reader: asyncio.StreamReader, limit: int
+) -> tuple[bytes, int]:
+    """Read a stream keeping only its last ``limit`` bytes, plus its total size."""
+    data = bytearray()
+    size = 0
+    while chunk := await reader.read(READ_CHUNK_SIZE):
+        size += len(chunk)
+        data += chunk
+        if len(data) > limit:
+            del data[:-limit]
+    return bytes(data), size
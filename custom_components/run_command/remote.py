@@ -0,0 +1,173 @@
+"""Remote execution over SSH for Run Command integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from .const import (
+    CONF_REMOTE_HOST,
+    CONF_REMOTE_IDENTITY,
+    CONF_REMOTE_PORT,
+    DEFAULT_REMOTE_PORT,
+    REMOTE_BACKOFF_MAX,
+    REMOTE_CONNECT_TIMEOUT,
+    REMOTE_KEEPALIVE,
+    REMOTE_MAX_CHANNELS,
+    REMOTE_PERSIST,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SSH = "ssh"
+# 연결 실패 시 ssh가 반환하는 종료 코드
+SSH_CONNECTION_ERROR = 255
+
+
+@dataclass(frozen=True)
+class RemoteHost:
+    """An SSH destination; an empty host means the command runs locally."""
+
+    host: str = ""
+    port: int = DEFAULT_REMOTE_PORT
+    identity: str = ""
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> RemoteHost:
+        """Build the destination from a config entry's data."""
+        return cls(
+            host=(config.get(CONF_REMOTE_HOST) or "").strip(),
+            port=config.get(CONF_REMOTE_PORT, DEFAULT_REMOTE_PORT),
+            identity=(config.get(CONF_REMOTE_IDENTITY) or "").strip(),
+        )
+
+    def __bool__(self) -> bool:
+        """Return True if commands run on a remote host."""
+        return bool(self.host)
+
+    def _options(self, control_dir: str) -> list[str]:
+        """Return the ssh options shared by commands and control requests."""
+        options = [
+            "-p", str(self.port),
+            "-o", "BatchMode=yes",
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={os.path.join(control_dir, '%C')}",
+            "-o", f"ControlPersist={REMOTE_PERSIST}",
+            "-o", f"ConnectTimeout={REMOTE_CONNECT_TIMEOUT}",
+            "-o", f"ServerAliveInterval={REMOTE_KEEPALIVE}",
+            "-o", "ServerAliveCountMax=3",
+        ]
+        if self.identity:
+            options.extend(["-i", self.identity])
+        return options
+
+    def argv(self, control_dir: str, command: str) -> list[str]:
+        """Return the argv running ``command`` on the host.
+
+        The first command opens a master connection that stays open for
+        ``REMOTE_PERSIST`` seconds after the last use; later commands open
+        a new channel on it without a TCP or key-exchange handshake.
+        """
+        return [SSH, *self._options(control_dir), "-T", self.host, "--", command]
+
+    def exit_argv(self, control_dir: str) -> list[str]:
+        """Return the argv that closes the master connection."""
+        return [SSH, *self._options(control_dir), "-O", "exit", self.host]
+
+
+class _HostState:
+    """Channel limit and reconnect backoff of one host."""
+
+    def __init__(self, max_channels: int) -> None:
+        """Initialize the state."""
+        self.channels = asyncio.Semaphore(max_channels)
+        self.failures = 0
+        self.next_attempt = 0.0
+
+
+class RemoteConnections:
+    """Pooled SSH connections, one multiplexed master per host.
+
+    At most ``max_channels`` commands run on a host at once (OpenSSH
+    allows 10 sessions per connection by default). When a connection
+    fails, commands for that host are refused for a delay that doubles
+    with every failure, up to ``REMOTE_BACKOFF_MAX`` seconds.
+    """
+
+    def __init__(self, max_channels: int = REMOTE_MAX_CHANNELS) -> None:
+        """Initialize the connections."""
+        self.max_channels = max_channels
+        self._hosts: dict[RemoteHost, _HostState] = {}
+        self._control_dir: str | None = None
+
+    def _state(self, remote: RemoteHost) -> _HostState:
+        """Return the state of a host, creating it on first use."""
+        if (state := self._hosts.get(remote)) is None:
+            state = self._hosts[remote] = _HostState(self.max_channels)
+        return state
+
+    def channels(self, remote: RemoteHost) -> asyncio.Semaphore:
+        """Return the semaphore limiting concurrent commands on a host."""
+        return self._state(remote).channels
+
+    def retry_in(self, remote: RemoteHost) -> float:
+        """Return the seconds until the host may be tried again."""
+        return max(0.0, self._state(remote).next_attempt - time.monotonic())
+
+    def record(self, remote: RemoteHost, connected: bool) -> None:
+        """Record whether a command could reach the host."""
+        state = self._state(remote)
+        if connected:
+            state.failures = 0
+            state.next_attempt = 0.0
+            return
+        state.failures += 1
+        delay = min(REMOTE_BACKOFF_MAX, 2 ** (state.failures - 1))
+        state.next_attempt = time.monotonic() + delay
+        _LOGGER.warning(
+            "SSH 연결 실패 (%s회 연속), %s초 후 다시 연결: %s",
+            state.failures,
+            delay,
+            remote.host,
+        )
+
+    async def async_control_dir(self) -> str:
+        """Return the private directory holding the control sockets."""
+        if self._control_dir is None:
+            # 소켓 경로 길이 제한이 있으므로 짧은 임시 디렉터리 사용
+            self._control_dir = await asyncio.get_running_loop().run_in_executor(
+                None, tempfile.mkdtemp, "", "run_command_ssh_"
+            )
+        return self._control_dir
+
+    async def async_close(self) -> None:
+        """Close every master connection and remove the control sockets."""
+        if self._control_dir is None:
+            return
+        for remote in list(self._hosts):
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *remote.exit_argv(self._control_dir),
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL,
+                )
+            except OSError as err:
+                _LOGGER.debug("SSH 연결 종료 실패 (%s): %s", remote.host, err)
+                continue
+            try:
+                async with asyncio.timeout(REMOTE_CONNECT_TIMEOUT):
+                    await proc.wait()
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+        self._hosts.clear()
+        await asyncio.get_running_loop().run_in_executor(
+            None, shutil.rmtree, self._control_dir, True
+        )
+        self._control_dir = None
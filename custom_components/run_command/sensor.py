@@ -1,36 +1,141 @@
 """Sensor platform for Run Command integration."""
 from __future__ import annotations
 
-import asyncio
-import json
+import hashlib
 import logging
+import re
+import time
+import zlib
+from collections.abc import Awaitable, Callable
 from datetime import datetime, timedelta
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import (
+    MATCH_ALL,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+    EntityCategory,
+    UnitOfTime,
+)
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.exceptions import TemplateError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import (
+    TrackTemplate,
+    TrackTemplateResult,
+    async_call_later,
+    async_track_template_result,
+    async_track_time_interval,
+)
+from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.template import Template
+from homeassistant.helpers.typing import UNDEFINED, UndefinedType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
+from .backoff import CIRCUIT_OPEN, PollBackoff
 from .const import (
+    ATTR_CIRCUIT,
+    ATTR_CONSECUTIVE_FAILURES,
+    ATTR_LAST_UPDATE,
+    ATTR_NEXT_ATTEMPT,
+    ATTR_OUTPUT_TRUNCATED,
+    ATTR_POLL_INTERVAL,
+    ATTR_QUEUE_WAIT,
+    BACKOFF_MAX_DELAY,
+    CIRCUIT_OPEN_TIME,
+    CONF_ADAPTIVE_INTERVAL,
+    CONF_ALWAYS_RENDER,
     CONF_ATTRIBUTE_TEMPLATES,
+    CONF_CHILD_SENSORS,
     CONF_COMMAND,
+    CONF_DEADBAND,
+    CONF_DEADBAND_TYPE,
+    CONF_EXTRACTOR,
+    CONF_EXTRACTOR_EXPRESSION,
+    CONF_FAILURE_THRESHOLD,
+    CONF_HEARTBEAT_INTERVAL,
     CONF_KEEP_LAST_VALUE,
+    CONF_MIN_WRITE_INTERVAL,
     CONF_NAME,
+    CONF_OUTPUT_CACHE_TTL,
+    CONF_POLL_FALLBACK,
+    CONF_PRIORITY,
+    CONF_RESULT_TTL,
     CONF_SCAN_INTERVAL,
-    CONF_TIMEOUT,
+    CONF_STARTUP_MODE,
+    CONF_STREAM_FORMAT,
     CONF_UNIT_OF_MEASUREMENT,
+    CONF_UPDATE_MODE,
     CONF_VALUE_TEMPLATE,
+    DATA_REFRESH,
+    DATA_STATS,
+    DEFAULT_DEADBAND_TYPE,
+    DEFAULT_FAILURE_THRESHOLD,
+    DEFAULT_PRIORITY,
+    DEFAULT_RESULT_TTL,
     DEFAULT_SCAN_INTERVAL,
-    DEFAULT_TIMEOUT,
+    DEFAULT_STARTUP_MODE,
+    DEFAULT_STREAM_FORMAT,
+    DEFAULT_UPDATE_MODE,
     DOMAIN,
+    EVENT_DEBOUNCE_TIME,
+    EXECUTION_MODE_BATCH,
+    EXTRACTOR_JSONPATH,
+    EXTRACTOR_NONE,
+    OFFLOAD_THRESHOLD,
+    SOURCE_TYPE_FILE,
+    STARTUP_MODE_RESTORE,
+    UPDATE_MODE_EVENT,
+    UPDATE_MODE_STREAM,
 )
+from .coordinator import RunCommandCoordinator
+from .executor import CommandOptions, CommandResult, async_get_executor
+from .extract import compile_extractor
+from .file_source import FileWatcher, parse_paths
+from .output_cache import CachedOutput, OutputCache, output_key
+from .parsing import parse_json, prepare_output
+from .startup import async_get_startup_wave
+from .stream import CommandStream
+from .telemetry import CommandStats
+from .throttle import StateWriteFilter
 
 _LOGGER = logging.getLogger(__name__)
 
+# 시간이나 다른 엔티티 상태를 참조하는 템플릿은 출력이 같아도 결과가 달라질 수 있음
+DYNAMIC_TEMPLATE_RE = re.compile(
+    r"\b(now|utcnow|today_at|states|state_attr|is_state|is_state_attr|has_value"
+    r"|expand|relative_time|time_since|time_until)\b"
+)
+VALUE_JSON_RE = re.compile(r"\bvalue_json\b")
+
+# 업데이트마다 바뀌는 속성 (레코더에 기록하지 않고 변경 판단에서도 제외)
+VOLATILE_ATTRIBUTES = frozenset({ATTR_LAST_UPDATE, ATTR_QUEUE_WAIT, ATTR_NEXT_ATTEMPT})
+
+
+def _templates_are_dynamic(config: dict[str, Any]) -> bool:
+    """Return True if a value or attribute template depends on more than the output."""
+    templates = [config.get(CONF_VALUE_TEMPLATE) or ""]
+    templates.extend((config.get(CONF_ATTRIBUTE_TEMPLATES) or {}).values())
+    return any(DYNAMIC_TEMPLATE_RE.search(template) for template in templates)
+
+
+def _config_uses_value_json(config: dict[str, Any]) -> bool:
+    """Return True if the extractor or a template needs the parsed value_json."""
+    if config.get(CONF_EXTRACTOR) == EXTRACTOR_JSONPATH:
+        return True
+    templates = [config.get(CONF_VALUE_TEMPLATE) or ""]
+    templates.extend((config.get(CONF_ATTRIBUTE_TEMPLATES) or {}).values())
+    return any(VALUE_JSON_RE.search(template) for template in templates)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -40,38 +145,53 @@ async def async_setup_entry(
     """Set up Run Command sensor from a config entry."""
     config = hass.data[DOMAIN][config_entry.entry_id]
     
+    # 자식 센서가 정의된 경우 명령어 한 번의 결과를 여러 센서가 공유
+    if config.get(CONF_CHILD_SENSORS):
+        await _async_setup_child_sensors(hass, config_entry, config, async_add_entities)
+        return
+    
     sensor = RunCommandSensor(hass, config_entry.entry_id, config)
-    async_add_entities([sensor], update_before_add=True)
+    # 스트림 모드는 명령어가 끝나지 않으므로 추가 전 업데이트를 하지 않음
+    # (복원 시작 모드는 이전 상태로 바로 추가하고 시작 후 순차적으로 실행)
+    async_add_entities(
+        [sensor],
+        update_before_add=sensor.update_mode != UPDATE_MODE_STREAM
+        and config.get(CONF_STARTUP_MODE, DEFAULT_STARTUP_MODE) != STARTUP_MODE_RESTORE,
+    )
+    stats_sensor = RunCommandStatsSensor(hass, config_entry.entry_id, config)
+    async_add_entities([stats_sensor])
+    _async_remove_stale_entities(
+        hass, config_entry, {sensor.unique_id, stats_sensor.unique_id}
+    )
+    _async_register_refresh(hass, config_entry, sensor._async_scheduled_update)
     
     # 설정 업데이트 시 센서 업데이트
     @callback
     def handle_options_update(hass: HomeAssistant, entry: ConfigEntry) -> None:
         """Handle options update."""
+        # 자식 센서가 추가되면 엔티티 구성이 바뀌므로 항목을 다시 불러옴
+        if entry.data.get(CONF_CHILD_SENSORS):
+            hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+            return
+        
         new_config = hass.data[DOMAIN][entry.entry_id]
         
-        # 센서 설정 업데이트
-        sensor._config = new_config
-        sensor._attr_name = new_config[CONF_NAME]
-        sensor._update_unit_of_measurement(new_config)
+        # 센서 설정 및 템플릿 업데이트
+        sensor._apply_config(new_config)
+        sensor._fingerprint = None
         
-        # 템플릿 업데이트
-        sensor._command_template = Template(new_config[CONF_COMMAND], hass)
-        sensor._value_template = None
-        if new_config.get(CONF_VALUE_TEMPLATE):
-            sensor._value_template = Template(new_config[CONF_VALUE_TEMPLATE], hass)
+        # 저장된 출력이 유효하면 명령어 실행 없이 새 템플릿으로 다시 렌더링
+        rendered = sensor.async_render_cached_output()
         
-        # 속성 템플릿 업데이트
-        sensor._attribute_templates = {}
-        if new_config.get(CONF_ATTRIBUTE_TEMPLATES):
-            for attr_name, attr_template in new_config[CONF_ATTRIBUTE_TEMPLATES].items():
-                sensor._attribute_templates[attr_name] = Template(attr_template, hass)
+        # 변경된 실행 주기/업데이트 방식으로 재스케줄 (재로드 불필요)
+        sensor.async_schedule_updates()
         
-        # 기타 설정 업데이트
-        sensor._scan_interval = timedelta(
-            seconds=new_config.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
-        )
-        sensor._timeout = new_config.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
-        sensor._keep_last_value = new_config.get(CONF_KEEP_LAST_VALUE, False)
+        # 바뀐 명령어의 저장된 출력이 없으면 바로 실행
+        # (이벤트 모드는 입력이 바뀔 때까지 실행되지 않으므로 항상 한 번 실행)
+        if sensor.update_mode != UPDATE_MODE_STREAM and (
+            not rendered or sensor.update_mode == UPDATE_MODE_EVENT
+        ):
+            sensor._async_request_update()
         
         # 엔티티 레지스트리 업데이트로 상태 즉시 반영
         sensor.async_write_ha_state()
@@ -82,37 +202,163 @@ async def async_setup_entry(
     )
 
 
-class RunCommandSensor(SensorEntity):
-    """Representation of a Run Command sensor."""
+@callback
+def _async_remove_stale_entities(
+    hass: HomeAssistant, config_entry: ConfigEntry, unique_ids: set[str]
+) -> None:
+    """Remove the entry's registered entities that it no longer creates.
 
-    def __init__(self, hass: HomeAssistant, entry_id: str, config: dict[str, Any]) -> None:
+    Adding or removing child sensors replaces the main sensor with the
+    children or the other way around.
+    """
+    registry = er.async_get(hass)
+    for entity in er.async_entries_for_config_entry(registry, config_entry.entry_id):
+        if entity.unique_id not in unique_ids:
+            registry.async_remove(entity.entity_id)
+
+
+@callback
+def _async_register_refresh(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    refresh: Callable[[], Awaitable[None]],
+) -> None:
+    """Let the execute service refresh the entry without racing its updates."""
+    refreshers = hass.data[DOMAIN].setdefault(DATA_REFRESH, {})
+    refreshers[config_entry.entry_id] = refresh
+    config_entry.async_on_unload(
+        lambda: refreshers.pop(config_entry.entry_id, None)
+    )
+
+
+async def _async_setup_child_sensors(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    config: dict[str, Any],
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up one coordinator and a sensor for each child definition."""
+    children = {
+        key: {
+            CONF_KEEP_LAST_VALUE: config.get(CONF_KEEP_LAST_VALUE, False),
+            CONF_ALWAYS_RENDER: config.get(CONF_ALWAYS_RENDER, False),
+            CONF_DEADBAND: config.get(CONF_DEADBAND, 0),
+            CONF_DEADBAND_TYPE: config.get(CONF_DEADBAND_TYPE, DEFAULT_DEADBAND_TYPE),
+            CONF_MIN_WRITE_INTERVAL: config.get(CONF_MIN_WRITE_INTERVAL, 0),
+            CONF_HEARTBEAT_INTERVAL: config.get(CONF_HEARTBEAT_INTERVAL, 0),
+            CONF_STARTUP_MODE: config.get(CONF_STARTUP_MODE, DEFAULT_STARTUP_MODE),
+            **child,
+        }
+        for key, child in config[CONF_CHILD_SENSORS].items()
+    }
+    coordinator = RunCommandCoordinator(
+        hass,
+        config,
+        always_update=any(_templates_are_dynamic(child) for child in children.values()),
+        uses_value_json=any(
+            _config_uses_value_json(child) for child in children.values()
+        ),
+        stats=hass.data[DOMAIN][DATA_STATS][config_entry.entry_id],
+        output_cache=OutputCache(
+            hass, config_entry.entry_id, config.get(CONF_OUTPUT_CACHE_TTL, 0)
+        ),
+    )
+    if config.get(CONF_STARTUP_MODE, DEFAULT_STARTUP_MODE) == STARTUP_MODE_RESTORE:
+        # 설정을 기다리지 않고 Home Assistant 시작 후 순서대로 첫 실행
+        # (실행 주기도 첫 실행부터 시작하도록 그때까지 비워 둠)
+        update_interval, coordinator.update_interval = coordinator.update_interval, None
+
+        @callback
+        def _async_start_first_update() -> None:
+            coordinator.update_interval = update_interval
+            hass.async_create_background_task(
+                coordinator.async_refresh(), f"{DOMAIN} update"
+            )
+
+        config_entry.async_on_unload(
+            async_get_startup_wave(hass).async_schedule(_async_start_first_update)
+        )
+    else:
+        await coordinator.async_refresh()
+    
+    sensors = [
+        RunCommandChildSensor(coordinator, config_entry.entry_id, config, key, child)
+        for key, child in children.items()
+    ]
+    stats_sensor = RunCommandStatsSensor(hass, config_entry.entry_id, config)
+    async_add_entities(sensors)
+    async_add_entities([stats_sensor])
+    _async_remove_stale_entities(
+        hass,
+        config_entry,
+        {*(sensor.unique_id for sensor in sensors), stats_sensor.unique_id},
+    )
+    _async_register_refresh(hass, config_entry, coordinator.async_request_refresh)
+    
+    # 자식 센서 구성이 바뀔 수 있으므로 설정 변경 시 다시 불러옴
+    async def handle_options_update(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Reload the entry when its options change."""
+        await hass.config_entries.async_reload(entry.entry_id)
+    
+    config_entry.async_on_unload(
+        config_entry.add_update_listener(handle_options_update)
+    )
+
+
+class RunCommandSensorBase(RestoreEntity, SensorEntity):
+    """Render value and attribute templates from command output."""
+
+    _unrecorded_attributes = VOLATILE_ATTRIBUTES
+
+    def __init__(self, hass: HomeAssistant, config: dict[str, Any]) -> None:
         """Initialize the sensor."""
         self.hass = hass
-        self._entry_id = entry_id
+        self._state: Any = None
+        self._attributes: dict[str, Any] = {}
+        self._last_update: datetime | None = None
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self._apply_config(config)
+
+    def _apply_config(self, config: dict[str, Any]) -> None:
+        """Apply the (updated) configuration."""
         self._config = config
-        self._attr_name = config[CONF_NAME]
-        self._attr_unique_id = f"{DOMAIN}_{entry_id}"
         
         # 측정 단위 설정
         self._update_unit_of_measurement(config)
         
-        self._command_template = Template(config[CONF_COMMAND], hass)
         self._value_template = None
         if config.get(CONF_VALUE_TEMPLATE):
-            self._value_template = Template(config[CONF_VALUE_TEMPLATE], hass)
+            self._value_template = Template(config[CONF_VALUE_TEMPLATE], self.hass)
         self._attribute_templates: dict[str, Template] = {}
         if config.get(CONF_ATTRIBUTE_TEMPLATES):
             for attr_name, attr_template in config[CONF_ATTRIBUTE_TEMPLATES].items():
-                self._attribute_templates[attr_name] = Template(attr_template, hass)
+                self._attribute_templates[attr_name] = Template(attr_template, self.hass)
         
-        self._scan_interval = timedelta(
-            seconds=config.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
-        )
-        self._timeout = config.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
         self._keep_last_value = config.get(CONF_KEEP_LAST_VALUE, False)
-        self._state: Any = None
-        self._attributes: dict[str, Any] = {}
-        self._last_update: datetime | None = None
+        self._startup_mode = config.get(CONF_STARTUP_MODE, DEFAULT_STARTUP_MODE)
+        self._always_render = config.get(
+            CONF_ALWAYS_RENDER, False
+        ) or _templates_are_dynamic(config)
+        # 값 추출기는 한 번만 컴파일 (설정 화면에서 이미 검증됨)
+        self._extractor = None
+        try:
+            self._extractor = compile_extractor(
+                config.get(CONF_EXTRACTOR, EXTRACTOR_NONE),
+                config.get(CONF_EXTRACTOR_EXPRESSION) or "",
+            )
+        except ValueError as err:
+            _LOGGER.error("값 추출기 설정 오류: %s", err)
+        
+        # value_json을 참조하는 템플릿이나 추출기가 없으면 JSON 파싱 생략
+        self._uses_value_json = _config_uses_value_json(config)
+        
+        # 불감대, 최소 기록 간격, 주기적 기록 (모두 0이면 사용하지 않음)
+        self._write_filter = StateWriteFilter(
+            config.get(CONF_DEADBAND, 0),
+            config.get(CONF_DEADBAND_TYPE, DEFAULT_DEADBAND_TYPE),
+            config.get(CONF_MIN_WRITE_INTERVAL, 0),
+            config.get(CONF_HEARTBEAT_INTERVAL, 0),
+        )
 
     def _update_unit_of_measurement(self, config: dict[str, Any]) -> None:
         """Update unit of measurement from config."""
@@ -128,54 +374,508 @@ class RunCommandSensor(SensorEntity):
         """Return a unique ID."""
         return self._attr_unique_id
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes."""
+        return self._attributes
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last state when starting without a first run."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._async_cancel_flush)
+        if self._startup_mode != STARTUP_MODE_RESTORE or self._state is not None:
+            return
+        if (last_state := await self.async_get_last_state()) is None:
+            return
+        
+        if last_state.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+            self._state = last_state.state
+        # 이 센서가 만든 속성만 복원 (friendly_name, 단위 등은 제외)
+        for name in (*self._attribute_templates, ATTR_LAST_UPDATE):
+            if name in last_state.attributes:
+                self._attributes[name] = last_state.attributes[name]
+
+    def _process_output(
+        self,
+        raw_result: str,
+        previous_state: Any,
+        value_json: Any | UndefinedType = UNDEFINED,
+        extracted: Any | UndefinedType = UNDEFINED,
+    ) -> None:
+        """Render the state and attributes from successful command output.
+
+        ``value_json`` and ``extracted`` may be passed when the output was
+        already parsed or the extractor already applied.
+        """
+        template_failed = False
+        
+        # 템플릿 변수 준비 - value는 항상 문자열 그대로
+        template_vars = {
+            "value": raw_result  # 원본 텍스트 그대로 유지
+        }
+
+        # JSON 파싱 시도 - value_json에만 파싱된 값 저장 (참조하는 템플릿이 있을 때만)
+        if value_json is UNDEFINED:
+            value_json = parse_json(raw_result) if self._uses_value_json else None
+        template_vars["value_json"] = value_json
+
+        # 값 추출기 또는 값 템플릿 처리 (추출기가 값을 찾지 못하면 값 템플릿 사용)
+        if self._extractor is not None or self._value_template:
+            try:
+                rendered_value = None
+                if extracted is not UNDEFINED:
+                    rendered_value = extracted
+                elif self._extractor is not None:
+                    rendered_value = self._extractor(raw_result, value_json)
+                if rendered_value is None and self._value_template:
+                    rendered_value = self._value_template.async_render(template_vars)
+
+                # 기존값 유지 옵션이 켜져있고, 특정 값들인 경우 이전 상태 유지
+                if self._keep_last_value and str(rendered_value).lower() in ["false", "none", "unknown", "unavailable"]:
+                    self._state = previous_state
+                    self._attributes["template_result"] = str(rendered_value)
+                else:
+                    self._state = rendered_value
+
+            except TemplateError as err:
+                _LOGGER.error("값 템플릿 렌더링 오류: %s", err)
+                template_failed = True
+                self._attributes["template_error"] = str(err)
+
+                if self._keep_last_value:
+                    self._state = previous_state
+                else:
+                    self._state = None
+        else:
+            self._state = raw_result
+
+        # 속성 초기화
+        new_attributes = {}
+
+        # 속성 템플릿 처리
+        for attr_name, attr_template in self._attribute_templates.items():
+            try:
+                new_attributes[attr_name] = attr_template.async_render(template_vars)
+            except TemplateError as err:
+                _LOGGER.error("속성 템플릿 '%s' 렌더링 오류: %s", attr_name, err)
+                new_attributes[attr_name] = None
+
+        # 속성 업데이트
+        self._attributes = new_attributes
+
+        # 마지막 업데이트 시간 추가
+        self._attributes["last_update"] = self._last_update.isoformat()
+
+        # 에러 속성 관리
+        if "last_error" in self._attributes:
+            del self._attributes["last_error"]
+        if not template_failed and "template_error" in self._attributes:
+            del self._attributes["template_error"]
+        if not template_failed and "template_result" in self._attributes:
+            del self._attributes["template_result"]
+
+    @callback
+    def _async_write_state(self, force: bool = False) -> None:
+        """Write the state unless the write filter holds it back."""
+        if not self._write_filter:
+            self.async_write_ha_state()
+            return
+        
+        # 주기적 기록은 상태와 속성이 같아도 기록되도록 강제
+        heartbeat = self._write_filter.heartbeat_due()
+        attributes = {
+            name: value
+            for name, value in self._attributes.items()
+            if name not in VOLATILE_ATTRIBUTES
+        }
+        if not self._write_filter.should_write(self._state, attributes, force):
+            # 최소 기록 간격 때문에 보류된 변경은 같은 출력이 반복되어도 간격이 지나면 기록
+            if (
+                delay := self._write_filter.pending_delay()
+            ) is not None and self._unsub_flush is None:
+                self._unsub_flush = async_call_later(
+                    self.hass, delay, self._async_flush_write
+                )
+            return
+        self._async_cancel_flush()
+        self._attr_force_update = heartbeat
+        try:
+            self.async_write_ha_state()
+        finally:
+            self._attr_force_update = False
+
+    @callback
+    def _async_flush_write(self, _now: datetime) -> None:
+        """Write a change that was held back by the minimum write interval."""
+        self._unsub_flush = None
+        self._async_write_state()
+
+    @callback
+    def _async_cancel_flush(self) -> None:
+        """Cancel a scheduled write of a held-back change."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+    @property
+    def state(self) -> Any:
+        """Return the state of the sensor."""
+        return self._state
+
+
+class RunCommandSensor(RunCommandSensorBase):
+    """Representation of a Run Command sensor."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, config: dict[str, Any]) -> None:
+        """Initialize the sensor."""
+        self._entry_id = entry_id
+        self._attr_unique_id = f"{DOMAIN}_{entry_id}"
+        self._fingerprint: tuple[int | None, bytes] | None = None
+        self._output_unchanged = False
+        self._updating = False
+        self._update_pending = False
+        self._unsub_start: CALLBACK_TYPE | None = None
+        self._unsub_interval: CALLBACK_TYPE | None = None
+        self._unsub_track: CALLBACK_TYPE | None = None
+        self._unsub_retry: CALLBACK_TYPE | None = None
+        self._file_watcher: FileWatcher | None = None
+        self._debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=EVENT_DEBOUNCE_TIME,
+            immediate=True,
+            function=self._async_triggered_update,
+            background=True,
+        )
+        self._stream: CommandStream | None = None
+        self._stats: CommandStats = hass.data[DOMAIN][DATA_STATS][entry_id]
+        self._output_cache = OutputCache(
+            hass, entry_id, config.get(CONF_OUTPUT_CACHE_TTL, 0)
+        )
+        self._cache_checked = False
+        super().__init__(hass, config)
+
+    def _apply_config(self, config: dict[str, Any]) -> None:
+        """Apply the (updated) configuration."""
+        super()._apply_config(config)
+        self._attr_name = config[CONF_NAME]
+        self._command_template = Template(config[CONF_COMMAND], self.hass)
+        self._scan_interval = timedelta(
+            seconds=config.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        )
+        self._command_options = CommandOptions.from_config(config)
+        self._result_ttl = config.get(CONF_RESULT_TTL, DEFAULT_RESULT_TTL)
+        self._priority = config.get(CONF_PRIORITY, DEFAULT_PRIORITY)
+        self._update_mode = config.get(CONF_UPDATE_MODE, DEFAULT_UPDATE_MODE)
+        self._stream_format = config.get(CONF_STREAM_FORMAT, DEFAULT_STREAM_FORMAT)
+        self._poll_fallback = config.get(CONF_POLL_FALLBACK, False)
+        self._output_cache.ttl = config.get(CONF_OUTPUT_CACHE_TTL, 0)
+        self._backoff = PollBackoff(
+            self._scan_interval.total_seconds(),
+            config.get(CONF_FAILURE_THRESHOLD, DEFAULT_FAILURE_THRESHOLD),
+            BACKOFF_MAX_DELAY,
+            CIRCUIT_OPEN_TIME,
+            adaptive=config.get(CONF_ADAPTIVE_INTERVAL, False),
+        )
+
     @property
     def should_poll(self) -> bool:
-        """Return True if entity has to be polled for state."""
-        return True
+        """Return False, the sensor schedules its own updates."""
+        return False
 
     @property
     def update_method(self) -> str:
         """Return the polling update method."""
         return "async_update"
 
+    async def async_added_to_hass(self) -> None:
+        """Start the update schedule when added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._async_cancel_updates)
+        
+        # 복원 시작 모드는 시작 후 다른 센서와 간격을 두고 첫 실행과 실행 주기를 시작
+        if self._startup_mode == STARTUP_MODE_RESTORE:
+            self.async_on_remove(
+                async_get_startup_wave(self.hass).async_schedule(
+                    self._async_start_first_update
+                )
+            )
+        else:
+            self.async_schedule_updates()
+
+    @callback
+    def _async_start_first_update(self) -> None:
+        """Start updating a sensor that was added with its restored state.
+
+        The first update runs now; the timer, stream or template tracking
+        only starts here, so nothing runs before the sensor's startup slot.
+        """
+        self.async_schedule_updates()
+        if self._update_mode != UPDATE_MODE_STREAM:
+            self.hass.async_create_background_task(
+                self._async_scheduled_update(), f"{DOMAIN} update"
+            )
+
     @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return the state attributes."""
-        return self._attributes
+    def update_mode(self) -> str:
+        """Return how the sensor is updated (poll or stream)."""
+        return self._update_mode
+
+    @callback
+    def async_schedule_updates(self) -> None:
+        """(Re)start the update timer for the configured scan interval.
+
+        Each entry gets a deterministic phase offset within the interval, so
+        sensors sharing an interval do not all run in the same second, except
+        in batch mode where they are meant to. In stream mode the command is
+        started once and supervised instead. In event mode the command runs
+        when the entities its template references change (and a file source
+        also when its files change), and on the timer only if polling is
+        kept as a fallback.
+        """
+        self._async_cancel_updates()
+
+        if self._update_mode == UPDATE_MODE_EVENT:
+            watching = (
+                self._command_options.source == SOURCE_TYPE_FILE
+                and self._async_watch_files()
+            )
+            self._async_track_command_template(warn_static=not watching)
+            if not self._poll_fallback:
+                return
+
+        if self._update_mode == UPDATE_MODE_STREAM:
+            self._stream = CommandStream(
+                self.hass,
+                self._command_template.async_render,
+                self._stream_format,
+                self._async_handle_stream_output,
+                self._async_handle_stream_exit,
+                self._command_options.limits,
+                self._command_options.remote,
+            )
+            self._stream.start()
+            return
+
+        interval = self._scan_interval.total_seconds()
+        offset = zlib.crc32(self._entry_id.encode()) % 1000 / 1000 * interval
+        # 배치 실행은 같은 주기의 센서가 같은 시점에 실행되어야 함께 묶임
+        if self._command_options.mode == EXECUTION_MODE_BATCH:
+            offset = 0
+        delay = interval - (time.time() - offset) % interval
+
+        @callback
+        def _async_start(now: datetime) -> None:
+            self._unsub_start = None
+            self._unsub_interval = async_track_time_interval(
+                self.hass,
+                self._async_scheduled_update,
+                self._scan_interval,
+                cancel_on_shutdown=True,
+            )
+            self.hass.async_create_background_task(
+                self._async_scheduled_update(now), f"{DOMAIN} update"
+            )
+
+        self._unsub_start = async_call_later(self.hass, delay, _async_start)
+
+    @callback
+    def _async_request_update(self) -> None:
+        """Run the command again soon (debounced) because an input changed."""
+        # 실행 중에 바뀐 경우 끝난 뒤 한 번 더 실행
+        if self._updating:
+            self._update_pending = True
+            return
+        self.hass.async_create_background_task(
+            self._debouncer.async_call(), f"{DOMAIN} update"
+        )
+
+    @callback
+    def _async_track_command_template(self, warn_static: bool = True) -> None:
+        """Run the command again whenever its rendered text changes."""
+
+        @callback
+        def _async_command_changed(
+            event: Event | None,
+            updates: list[TrackTemplateResult],
+        ) -> None:
+            self._async_request_update()
+
+        if warn_static and self._command_template.is_static:
+            _LOGGER.warning(
+                "명령어 템플릿이 다른 엔티티를 참조하지 않아 이벤트로 실행되지 않습니다: %s",
+                self._attr_name,
+            )
+        info = async_track_template_result(
+            self.hass,
+            [TrackTemplate(self._command_template, None)],
+            _async_command_changed,
+        )
+        self._unsub_track = info.async_remove
+
+    @callback
+    def _async_watch_files(self) -> bool:
+        """Watch the files of a file source; return True if any can be watched."""
+        self._file_watcher = FileWatcher(self._async_request_update)
+        try:
+            paths = parse_paths(self._command_template.async_render())
+        except TemplateError as err:
+            _LOGGER.warning("파일 경로 템플릿 렌더링 실패: %s", err)
+            return False
+        if not self._file_watcher.set_paths(paths):
+            _LOGGER.warning(
+                "변경을 감시할 수 있는 파일이 없습니다 (/proc, /sys 파일은 실행 주기 실행 사용): %s",
+                self._attr_name,
+            )
+            return False
+        return True
+
+    @callback
+    def _async_cancel_updates(self) -> None:
+        """Stop the update timer, stream or template tracking."""
+        if self._stream:
+            self._stream.stop()
+            self._stream = None
+        if self._unsub_start:
+            self._unsub_start()
+            self._unsub_start = None
+        if self._unsub_interval:
+            self._unsub_interval()
+            self._unsub_interval = None
+        if self._unsub_track:
+            self._unsub_track()
+            self._unsub_track = None
+        if self._file_watcher:
+            self._file_watcher.close()
+            self._file_watcher = None
+        if self._unsub_retry:
+            self._unsub_retry()
+            self._unsub_retry = None
+        self._debouncer.async_cancel()
+        self._update_pending = False
+
+    async def _async_triggered_update(self) -> None:
+        """Run an update because an input of the command changed."""
+        await self._async_scheduled_update(triggered=True)
+
+    @callback
+    def _async_retry_triggered_update(self) -> None:
+        """Run a held-back triggered update once the backoff allows it."""
+        if self._unsub_retry is not None:
+            return
+
+        @callback
+        def _async_retry(now: datetime) -> None:
+            self._unsub_retry = None
+            self._async_request_update()
+
+        self._unsub_retry = async_call_later(
+            self.hass, self._backoff.retry_in, _async_retry
+        )
+
+    async def _async_scheduled_update(
+        self, now: datetime | None = None, triggered: bool = False
+    ) -> None:
+        """Run a scheduled update unless the previous one is still running.
+
+        A ``triggered`` update (an input changed) is not dropped: it runs
+        again after an update in progress, and once a failure backoff or an
+        open circuit allows it.
+        """
+        if self._updating:
+            _LOGGER.debug("이전 업데이트가 아직 실행 중이므로 건너뜀: %s", self.entity_id)
+            if triggered:
+                self._update_pending = True
+            return
+        
+        # 연속 실패 후 대기 중이거나 회로가 열려 있으면 건너뜀
+        # (입력 변경으로 인한 실행은 적응형 실행 주기와 관계없이 바로 실행)
+        if not self._backoff.allow(triggered):
+            if triggered:
+                self._async_retry_triggered_update()
+            return
+
+        self._updating = True
+        try:
+            await self.async_update()
+        finally:
+            self._updating = False
+        
+        # 출력이 이전과 같으면 상태를 다시 기록하지 않음 (주기적 기록 제외)
+        if not self._output_unchanged or self._write_filter.heartbeat_due():
+            self._async_write_state()
+        
+        if self._update_pending:
+            self._update_pending = False
+            self.hass.async_create_background_task(
+                self._debouncer.async_call(), f"{DOMAIN} update"
+            )
+
+    @callback
+    def _async_handle_stream_output(self, raw_result: str) -> None:
+        """Render and push the state for one line or document of the stream."""
+        previous_state = self._state
+        self._last_update = dt_util.now()
+        self._process_output(raw_result, previous_state)
+        self._async_write_state()
+
+    @callback
+    def _async_handle_stream_exit(self, message: str) -> None:
+        """Record that the stream command exited."""
+        self._attributes["last_error"] = message
+        if not self._keep_last_value:
+            self._state = None
+        self._async_write_state(force=True)
 
     async def async_update(self) -> None:
         """Update the sensor."""
+        # 스트림 모드는 출력이 올 때마다 상태를 갱신하므로 실행하지 않음
+        if self._update_mode == UPDATE_MODE_STREAM:
+            return
+        
         # 이전 상태 저장 (기존값 유지 옵션용)
         previous_state = self._state
-        command_failed = False
-        template_failed = False
+        
+        # 재시작 후 첫 업데이트는 같은 명령어의 저장된 출력이 유효하면 명령어를 실행하지 않음
+        if not self._cache_checked:
+            self._cache_checked = True
+            if (key := self._output_key()) is not None and (
+                cached := await self._output_cache.async_load(key)
+            ) is not None:
+                self._render_cached_output(cached)
+                return
+        
+        # 출력 지문은 성공한 실행에서만 다시 기록
+        last_fingerprint, self._fingerprint = self._fingerprint, None
+        self._output_unchanged = False
+        
+        started = time.monotonic()
+        result: CommandResult | None = None
+        render_time = loop_time = 0.0
+        failed = True
         
         try:
             # 명령어 템플릿 렌더링
             command = self._command_template.async_render()
             
-            # 명령어 실행 (타임아웃 설정)
-            proc = await asyncio.create_subprocess_shell(
-                command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+            # 파일 경로 템플릿이 바뀌었으면 새 경로를 감시
+            if self._file_watcher is not None:
+                self._file_watcher.set_paths(parse_paths(command))
+            
+            # 명령어 실행 (동일 명령어는 공유 실행기에서 한 번만 실행)
+            result = await async_get_executor(self.hass).async_run(
+                command, self._command_options, self._result_ttl, self._priority
             )
+            stdout, stderr = result.stdout, result.stderr
+            queue_wait = round(result.queue_wait, 3)
             
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    proc.communicate(), 
-                    timeout=self._timeout
-                )
-            except asyncio.TimeoutError:
-                proc.kill()
-                await proc.wait()
-                _LOGGER.error(
-                    "명령어 실행 시간 초과 (%s초): %s", self._timeout, command
-                )
-                command_failed = True
-                self._attributes["last_error"] = f"Command timeout after {self._timeout} seconds"
+            if result.timed_out:
+                timeout = self._command_options.timeout
+                _LOGGER.error("명령어 실행 시간 초과 (%s초): %s", timeout, command)
+                self._attributes["last_error"] = f"Command timeout after {timeout} seconds"
                 self._last_update = dt_util.now()
                 self._attributes["last_update"] = self._last_update.isoformat()
+                self._attributes[ATTR_QUEUE_WAIT] = queue_wait
                 
                 if self._keep_last_value:
                     self._state = previous_state
@@ -183,14 +883,17 @@ class RunCommandSensor(SensorEntity):
                     self._state = None
                 return
             
-            if proc.returncode != 0:
+            # 출력 크기 제한으로 종료된 경우는 잘린 출력을 그대로 사용
+            if result.returncode != 0 and not (
+                result.truncated and self._command_options.kill_on_overflow
+            ):
                 _LOGGER.error(
-                    "명령어 실행 실패 (코드 %s): %s", proc.returncode, stderr.decode()
+                    "명령어 실행 실패 (코드 %s): %s", result.returncode, stderr.decode()
                 )
-                command_failed = True
                 self._attributes["last_error"] = stderr.decode().strip()
                 self._last_update = dt_util.now()
                 self._attributes["last_update"] = self._last_update.isoformat()
+                self._attributes[ATTR_QUEUE_WAIT] = queue_wait
                 
                 if self._keep_last_value:
                     self._state = previous_state
@@ -198,72 +901,56 @@ class RunCommandSensor(SensorEntity):
                     self._state = None
                 return
             
+            # 출력과 종료 코드가 이전과 같으면 템플릿 렌더링 생략
+            self._fingerprint = (
+                result.returncode,
+                hashlib.blake2b(stdout, digest_size=16).digest(),
+            )
+            if self._fingerprint == last_fingerprint and not self._always_render:
+                self._output_unchanged = True
+                self._output_cache.async_touch(dt_util.now())
+                failed = False
+                return
+            
             # 업데이트 시간 기록
             self._last_update = dt_util.now()
             
             # 결과 처리 - value는 항상 텍스트 문자열로 저장
-            raw_result = stdout.decode().strip()
-            
-            # 템플릿 변수 준비 - value는 항상 문자열 그대로
-            template_vars = {
-                "value": raw_result  # 원본 텍스트 그대로 유지
-            }
-            
-            # JSON 파싱 시도 - value_json에만 파싱된 값 저장
-            try:
-                json_data = json.loads(raw_result)
-                template_vars["value_json"] = json_data
-            except json.JSONDecodeError:
-                template_vars["value_json"] = None
-            
-            # 값 템플릿 처리
-            if self._value_template:
-                try:
-                    rendered_value = self._value_template.async_render(template_vars)
-                    
-                    # 기존값 유지 옵션이 켜져있고, 특정 값들인 경우 이전 상태 유지
-                    if self._keep_last_value and str(rendered_value).lower() in ["false", "none", "unknown", "unavailable"]:
-                        self._state = previous_state
-                        self._attributes["template_result"] = str(rendered_value)
-                    else:
-                        self._state = rendered_value
-                        
-                except TemplateError as err:
-                    _LOGGER.error("값 템플릿 렌더링 오류: %s", err)
-                    template_failed = True
-                    self._attributes["template_error"] = str(err)
-                    
-                    if self._keep_last_value:
-                        self._state = previous_state
-                    else:
-                        self._state = None
+            # (잘린 출력은 마지막 글자가 깨질 수 있으므로 무시)
+            # 큰 출력은 디코딩, JSON 파싱, 값 추출을 실행기 스레드에서 처리하고
+            # 템플릿 렌더링만 이벤트 루프에서 수행
+            render_started = loop_started = time.monotonic()
+            prepare_args = (
+                stdout, result.truncated, self._uses_value_json, self._extractor
+            )
+            if len(stdout) >= OFFLOAD_THRESHOLD:
+                raw_result, value_json, extracted = (
+                    await self.hass.async_add_executor_job(prepare_output, *prepare_args)
+                )
+                loop_started = time.monotonic()
             else:
-                self._state = raw_result
-            
-            # 속성 초기화
-            new_attributes = {}
-            
-            # 속성 템플릿 처리
-            for attr_name, attr_template in self._attribute_templates.items():
-                try:
-                    new_attributes[attr_name] = attr_template.async_render(template_vars)
-                except TemplateError as err:
-                    _LOGGER.error("속성 템플릿 '%s' 렌더링 오류: %s", attr_name, err)
-                    new_attributes[attr_name] = None
-            
-            # 속성 업데이트
-            self._attributes = new_attributes
+                raw_result, value_json, extracted = prepare_output(*prepare_args)
+            self._process_output(raw_result, previous_state, value_json, extracted)
+            render_time = time.monotonic() - render_started
+            loop_time = time.monotonic() - loop_started
+            self._output_cache.async_record(
+                output_key(command, self._command_options),
+                raw_result,
+                result.returncode,
+                self._last_update,
+            )
             
-            # 마지막 업데이트 시간 추가
-            self._attributes["last_update"] = self._last_update.isoformat()
+            if result.truncated:
+                _LOGGER.warning(
+                    "명령어 출력이 %s바이트에서 잘렸습니다: %s",
+                    self._command_options.max_output,
+                    command,
+                )
+                self._attributes[ATTR_OUTPUT_TRUNCATED] = True
             
-            # 에러 속성 관리
-            if not command_failed and "last_error" in self._attributes:
-                del self._attributes["last_error"]
-            if not template_failed and "template_error" in self._attributes:
-                del self._attributes["template_error"]
-            if not template_failed and "template_result" in self._attributes:
-                del self._attributes["template_result"]
+            # 실행 대기열에서 기다린 시간 (초)
+            self._attributes[ATTR_QUEUE_WAIT] = queue_wait
+            failed = False
                 
         except Exception as err:
             _LOGGER.error("센서 업데이트 중 오류: %s", err)
@@ -275,13 +962,168 @@ class RunCommandSensor(SensorEntity):
                 self._state = previous_state
             else:
                 self._state = None
+        
+        finally:
+            # 실행 통계 기록 (진단 정보 및 진단 센서에서 사용)
+            self._stats.async_record(
+                result, time.monotonic() - started, render_time, loop_time
+            )
+            self._record_backoff(failed, self._fingerprint != last_fingerprint)
 
-    @property
-    def state(self) -> Any:
-        """Return the state of the sensor."""
-        return self._state
+    def _render_cached_output(self, cached: CachedOutput) -> None:
+        """Render the state and attributes from a stored output."""
+        previous_state = self._state
+        self._last_update = cached.updated
+        self._process_output(cached.raw, previous_state)
+
+    def _output_key(self) -> str | None:
+        """Return the output cache key of the current command and options."""
+        try:
+            command = self._command_template.async_render()
+        except TemplateError:
+            return None
+        return output_key(command, self._command_options)
+
+    @callback
+    def async_render_cached_output(self) -> bool:
+        """Re-render the last output with the current templates, if still fresh.
+
+        Returns False if there is no fresh output of the current command and
+        options, so the command has to run.
+        """
+        if self._update_mode == UPDATE_MODE_STREAM:
+            return False
+        if (key := self._output_key()) is None or (
+            cached := self._output_cache.get(key)
+        ) is None:
+            return False
+        self._render_cached_output(cached)
+        return True
+
+    def _record_backoff(self, failed: bool, changed: bool) -> None:
+        """Plan the next poll from the outcome and expose the backoff state."""
+        was_open = self._backoff.state == CIRCUIT_OPEN
+        self._backoff.record(failed, changed)
+        
+        if self._backoff.state == CIRCUIT_OPEN and not was_open:
+            _LOGGER.warning(
+                "연속 %s회 실패로 %s초 동안 실행 중단: %s",
+                self._backoff.failures,
+                CIRCUIT_OPEN_TIME,
+                self.entity_id,
+            )
+        
+        for attr in (
+            ATTR_CONSECUTIVE_FAILURES,
+            ATTR_CIRCUIT,
+            ATTR_NEXT_ATTEMPT,
+            ATTR_POLL_INTERVAL,
+        ):
+            self._attributes.pop(attr, None)
+        
+        if self._backoff.failures:
+            self._attributes[ATTR_CONSECUTIVE_FAILURES] = self._backoff.failures
+            self._attributes[ATTR_CIRCUIT] = self._backoff.state
+            if self._backoff.retry_in:
+                next_attempt = dt_util.now() + timedelta(
+                    seconds=self._backoff.retry_in
+                )
+                self._attributes[ATTR_NEXT_ATTEMPT] = next_attempt.isoformat()
+        if self._backoff.factor > 1:
+            self._attributes[ATTR_POLL_INTERVAL] = (
+                self._scan_interval.total_seconds() * self._backoff.factor
+            )
 
     @property
     def scan_interval(self) -> timedelta:
         """Return the polling interval."""
         return self._scan_interval
+
+
+class RunCommandChildSensor(
+    CoordinatorEntity[RunCommandCoordinator], RunCommandSensorBase
+):
+    """A sensor rendering its own templates from a shared command's output."""
+
+    def __init__(
+        self,
+        coordinator: RunCommandCoordinator,
+        entry_id: str,
+        entry_config: dict[str, Any],
+        key: str,
+        config: dict[str, Any],
+    ) -> None:
+        """Initialize the child sensor."""
+        CoordinatorEntity.__init__(self, coordinator)
+        RunCommandSensorBase.__init__(self, coordinator.hass, config)
+        self._attr_name = f"{entry_config[CONF_NAME]} {key}"
+        self._attr_unique_id = f"{DOMAIN}_{entry_id}_{key}"
+        self._update_from_coordinator()
+
+    @property
+    def available(self) -> bool:
+        """Return True, failures are reported through attributes like other sensors."""
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Render the new output and write the state."""
+        self._update_from_coordinator()
+        self._async_write_state()
+
+    def _update_from_coordinator(self) -> None:
+        """Render the state and attributes from the coordinator's last run."""
+        previous_state = self._state
+        
+        if not self.coordinator.last_update_success:
+            self._attributes["last_error"] = str(self.coordinator.last_exception)
+            self._last_update = dt_util.now()
+            self._attributes["last_update"] = self._last_update.isoformat()
+            
+            if not self._keep_last_value:
+                self._state = None
+            return
+        
+        if (output := self.coordinator.data) is None:
+            return
+        
+        self._last_update = output.updated
+        self._process_output(output.raw, previous_state, output.value_json)
+
+
+class RunCommandStatsSensor(SensorEntity):
+    """Diagnostic sensor reporting how long an entry's command takes.
+
+    The state is the duration of the last update; counters, phase timings
+    and percentiles are exposed as attributes. Disabled by default.
+    """
+
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    # 통계 속성은 업데이트마다 바뀌므로 레코더에 기록하지 않음
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, config: dict[str, Any]) -> None:
+        """Initialize the sensor."""
+        self.hass = hass
+        self._stats: CommandStats = hass.data[DOMAIN][DATA_STATS][entry_id]
+        self._attr_name = f"{config[CONF_NAME]} run duration"
+        self._attr_unique_id = f"{DOMAIN}_{entry_id}_run_duration"
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the entry's statistics."""
+        self.async_on_remove(self._stats.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the duration of the last update in milliseconds."""
+        return self._stats.as_dict()["last_duration_ms"]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the execution statistics."""
+        return self._stats.as_dict()
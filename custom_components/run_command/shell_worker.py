@@ -0,0 +1,190 @@
+"""Persistent shell workers for Run Command integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import secrets
+import shlex
+import signal
+from collections.abc import Awaitable, Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+SHELL = "/bin/sh"
+READ_CHUNK_SIZE = 65536
+STDERR_TAIL_SIZE = 4096
+
+
+class ShellWorkerError(Exception):
+    """Error to indicate the shell worker exited while running a command."""
+
+
+class ShellWorker:
+    """A long-lived shell that runs commands written to its stdin.
+
+    Each command runs in a subshell so ``cd``, ``exit`` or variable changes do
+    not leak into later commands. Its stdout and stderr are followed by a
+    random sentinel (plus the exit code on stdout) so the output of one
+    command can be told apart from the next. A shell whose command timed
+    out is handed to ``kill``, which terminates its process group.
+    """
+
+    def __init__(
+        self, kill: Callable[[asyncio.subprocess.Process], Awaitable[None]]
+    ) -> None:
+        """Initialize the worker."""
+        self._kill = kill
+        self._proc: asyncio.subprocess.Process | None = None
+
+    @property
+    def alive(self) -> bool:
+        """Return True if the shell process is running."""
+        return self._proc is not None and self._proc.returncode is None
+
+    async def _async_start(self) -> asyncio.subprocess.Process:
+        """Start (or restart) the shell process."""
+        if self._proc is not None:
+            _LOGGER.debug("셸 워커 재시작 (종료 코드 %s)", self._proc.returncode)
+        self._proc = await asyncio.create_subprocess_exec(
+            SHELL,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+        return self._proc
+
+    async def async_run(
+        self, command: str, timeout: float, max_output: int
+    ) -> tuple[bytes, bytes, int, int, int]:
+        """Run a command and return stdout, stderr, the exit code and their sizes.
+
+        Only the first ``max_output`` bytes of stdout and the last bytes of
+        stderr are kept, while the sizes count every byte written; the rest
+        is read and discarded so the shell stays usable. Raises
+        asyncio.TimeoutError after terminating the shell and its command if
+        the command does not finish in time; the next call starts a fresh
+        shell.
+        """
+        proc = self._proc if self.alive else await self._async_start()
+        assert proc.stdin and proc.stdout and proc.stderr
+
+        token = secrets.token_hex(16).encode()
+        script = (
+            f"( eval {shlex.quote(command)} ) </dev/null\n"
+            f"printf '\\n%s %d\\n' {token.decode()} $?\n"
+            f"printf '\\n%s 0\\n' {token.decode()} >&2\n"
+        )
+
+        try:
+            proc.stdin.write(script.encode())
+            await proc.stdin.drain()
+            async with asyncio.timeout(timeout):
+                stdout_frame, stderr_frame = await asyncio.gather(
+                    _async_read_frame(proc.stdout, b"\n" + token + b" ", max_output),
+                    _async_read_frame(
+                        proc.stderr,
+                        b"\n" + token + b" ",
+                        STDERR_TAIL_SIZE,
+                        keep_tail=True,
+                    ),
+                )
+        except asyncio.TimeoutError:
+            # 출력이 중간에 끊긴 셸은 재사용할 수 없으므로 그룹째 종료
+            self._proc = None
+            await self._kill(proc)
+            raise
+        except BaseException:
+            self.close()
+            raise
+
+        stdout, trailer, stdout_size = stdout_frame
+        stderr, _, stderr_size = stderr_frame
+        return stdout, stderr, int(trailer), stdout_size, stderr_size
+
+    def close(self) -> None:
+        """Kill the shell process and any command it is running."""
+        if self.alive:
+            assert self._proc
+            try:
+                os.killpg(self._proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self._proc = None
+
+
+async def _async_read_frame(
+    reader: asyncio.StreamReader, marker: bytes, limit: int, keep_tail: bool = False
+) -> tuple[bytes, bytes, int]:
+    """Read until the marker.
+
+    Returns at most ``limit`` bytes of the data before the marker (its head,
+    or its tail with ``keep_tail``), the rest of the marker line and the
+    total size of the data.
+    """
+    data = bytearray()
+    pending = bytearray()
+    size = 0
+    while True:
+        chunk = await reader.read(READ_CHUNK_SIZE)
+        if not chunk:
+            raise ShellWorkerError("셸 워커가 명령어 실행 중 종료되었습니다")
+        pending += chunk
+
+        trailer: bytes | None = None
+        if (index := pending.find(marker)) != -1:
+            if (end := pending.find(b"\n", index + len(marker))) == -1:
+                continue
+            trailer = bytes(pending[index + len(marker):end])
+            split = index
+        else:
+            # 마커가 청크 경계에 걸쳐 있을 수 있으므로 끝부분은 남겨 둠
+            split = max(0, len(pending) - len(marker) + 1)
+
+        data += pending[:split]
+        size += split
+        del pending[:split]
+        if len(data) > limit:
+            if keep_tail:
+                del data[:-limit]
+            else:
+                del data[limit:]
+
+        if trailer is not None:
+            return bytes(data), trailer, size
+
+
+class ShellWorkerPool:
+    """A small pool of persistent shells shared by all entries."""
+
+    def __init__(
+        self,
+        size: int,
+        kill: Callable[[asyncio.subprocess.Process], Awaitable[None]],
+    ) -> None:
+        """Initialize the pool."""
+        self._kill = kill
+        self._semaphore = asyncio.Semaphore(size)
+        self._idle: list[ShellWorker] = []
+        self._busy: set[ShellWorker] = set()
+
+    async def async_run(
+        self, command: str, timeout: float, max_output: int
+    ) -> tuple[bytes, bytes, int, int, int]:
+        """Run a command on an idle worker, starting one if needed."""
+        async with self._semaphore:
+            worker = self._idle.pop() if self._idle else ShellWorker(self._kill)
+            self._busy.add(worker)
+            try:
+                return await worker.async_run(command, timeout, max_output)
+            finally:
+                self._busy.discard(worker)
+                if worker.alive:
+                    self._idle.append(worker)
+
+    def close(self) -> None:
+        """Kill every worker in the pool."""
+        for worker in (*self._idle, *self._busy):
+            worker.close()
+        self._idle.clear()
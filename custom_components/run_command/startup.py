@@ -0,0 +1,64 @@
+"""Staggered first updates for Run Command integration."""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.start import async_at_started
+
+from .const import DATA_STARTUP, DOMAIN, STARTUP_SPACING
+
+
+class StartupWave:
+    """Spread the first updates of entities over time.
+
+    Nothing runs before Home Assistant has started; from then on the queued
+    actions run ``spacing`` seconds apart, in the order they were queued.
+    Entities added later are slotted in after the last queued action.
+    """
+
+    def __init__(self, hass: HomeAssistant, spacing: float = STARTUP_SPACING) -> None:
+        """Initialize the wave."""
+        self.hass = hass
+        self.spacing = spacing
+        self._next_slot = 0.0
+
+    @callback
+    def async_schedule(self, action: Callable[[], None]) -> CALLBACK_TYPE:
+        """Run ``action`` in the next free slot; return a callback to cancel it."""
+        unsub_later: CALLBACK_TYPE | None = None
+
+        @callback
+        def _async_started(hass: HomeAssistant) -> None:
+            nonlocal unsub_later
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.spacing
+
+            @callback
+            def _async_run(_now: object) -> None:
+                nonlocal unsub_later
+                unsub_later = None
+                action()
+
+            unsub_later = async_call_later(self.hass, slot - now, _async_run)
+
+        unsub_started = async_at_started(self.hass, _async_started)
+
+        @callback
+        def cancel() -> None:
+            unsub_started()
+            if unsub_later is not None:
+                unsub_later()
+
+        return cancel
+
+
+def async_get_startup_wave(hass: HomeAssistant) -> StartupWave:
+    """Return the shared startup wave, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (wave := domain_data.get(DATA_STARTUP)) is None:
+        wave = domain_data[DATA_STARTUP] = StartupWave(hass)
+    return wave
@@ -0,0 +1,174 @@
+"""Long-running command streams for Run Command integration."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import signal
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DOMAIN,
+    STREAM_FORMAT_JSON,
+    STREAM_LINE_LIMIT,
+    STREAM_RESTART_MAX,
+    STREAM_RESTART_MIN,
+    STREAM_STABLE_TIME,
+)
+from .executor import async_get_executor
+from .limits import ResourceLimits
+from .process import signal_group
+from .remote import RemoteHost
+
+_LOGGER = logging.getLogger(__name__)
+
+STDERR_TAIL_LINES = 5
+
+
+class CommandStream:
+    """Supervise a long-running command and report each output document.
+
+    The command is restarted with exponential backoff whenever it exits.
+    Output is split into lines, or into JSON documents in JSON format.
+    A command for a remote host runs over the host's pooled SSH connection.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        render_command: Callable[[], str],
+        stream_format: str,
+        on_output: Callable[[str], None],
+        on_exit: Callable[[str], None],
+        limits: ResourceLimits = ResourceLimits(),
+        remote: RemoteHost = RemoteHost(),
+    ) -> None:
+        """Initialize the stream."""
+        self.hass = hass
+        self._limits = limits
+        self._remote = remote
+        self._render_command = render_command
+        self._stream_format = stream_format
+        self._on_output = on_output
+        self._on_exit = on_exit
+        self._task: asyncio.Task[None] | None = None
+        self._proc: asyncio.subprocess.Process | None = None
+
+    def start(self) -> None:
+        """Start supervising the command."""
+        if self._task is None:
+            self._task = self.hass.async_create_background_task(
+                self._async_supervise(), f"{DOMAIN} stream"
+            )
+
+    def stop(self) -> None:
+        """Stop the command and its supervisor."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._proc is not None and self._proc.returncode is None:
+            signal_group(self._proc, signal.SIGKILL)
+        self._proc = None
+
+    async def _async_supervise(self) -> None:
+        """Run the command, restarting it with backoff when it exits."""
+        backoff = STREAM_RESTART_MIN
+        while True:
+            started = time.monotonic()
+            try:
+                message = await self._async_run_once()
+            except Exception as err:  # pylint: disable=broad-except
+                message = str(err)
+
+            if time.monotonic() - started >= STREAM_STABLE_TIME:
+                backoff = STREAM_RESTART_MIN
+
+            _LOGGER.warning(
+                "스트림 명령어 종료, %s초 후 재시작: %s", backoff, message
+            )
+            self._on_exit(message)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, STREAM_RESTART_MAX)
+
+    async def _async_run_once(self) -> str:
+        """Run the command until it exits and return a description of the exit."""
+        executor = async_get_executor(self.hass)
+        command = self._limits.wrap_command(self._render_command())
+        kwargs = {
+            "stdin": asyncio.subprocess.DEVNULL,
+            "stdout": asyncio.subprocess.PIPE,
+            "stderr": asyncio.subprocess.PIPE,
+            "limit": STREAM_LINE_LIMIT,
+            "start_new_session": True,
+        }
+        if self._remote:
+            self._proc = proc = await asyncio.create_subprocess_exec(
+                *await executor.async_remote_argv(self._remote, command), **kwargs
+            )
+        else:
+            self._proc = proc = await asyncio.create_subprocess_shell(command, **kwargs)
+        assert proc.stdout and proc.stderr
+        # 통합 종료 시 함께 정리되도록 공유 실행기에 등록
+        unregister = executor.register_process(proc)
+
+        stderr_tail: deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+        stderr_task = asyncio.create_task(_async_drain(proc.stderr, stderr_tail))
+        try:
+            if self._stream_format == STREAM_FORMAT_JSON:
+                documents = _async_json_documents(proc.stdout)
+            else:
+                documents = _async_lines(proc.stdout)
+            async for document in documents:
+                self._on_output(document)
+            returncode = await proc.wait()
+            await stderr_task
+        finally:
+            unregister()
+            stderr_task.cancel()
+            if proc.returncode is None:
+                signal_group(proc, signal.SIGKILL)
+
+        if stderr_tail:
+            return "\n".join(stderr_tail)
+        return f"Command exited with code {returncode}"
+
+
+async def _async_drain(reader: asyncio.StreamReader, tail: deque[str]) -> None:
+    """Read a stream to the end, keeping only its last lines."""
+    while line := await reader.readline():
+        if text := line.decode(errors="replace").strip():
+            tail.append(text)
+
+
+async def _async_lines(reader: asyncio.StreamReader) -> AsyncIterator[str]:
+    """Yield each non-empty line of a stream."""
+    while line := await reader.readline():
+        if text := line.decode(errors="replace").strip():
+            yield text
+
+
+async def _async_json_documents(reader: asyncio.StreamReader) -> AsyncIterator[str]:
+    """Yield each JSON document of a stream, even when spread over lines."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    while line := await reader.readline():
+        buffer += line.decode(errors="replace")
+        while buffer := buffer.lstrip():
+            try:
+                _, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as err:
+                if err.pos < len(buffer.rstrip()):
+                    # 문서가 덜 온 것이 아니라 JSON이 아닌 줄이면 버림
+                    _LOGGER.debug("JSON이 아닌 출력 무시: %s", err)
+                    buffer = buffer.partition("\n")[2]
+                    continue
+                if len(buffer) > STREAM_LINE_LIMIT:
+                    _LOGGER.warning("JSON 문서가 너무 커서 버림 (%s자)", len(buffer))
+                    buffer = ""
+                break
+            yield buffer[:end]
+            buffer = buffer[end:]
@@ -0,0 +1,124 @@
+"""Execution telemetry for Run Command integration."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .const import STATS_WINDOW
+from .executor import CommandResult
+
+
+def _ms(seconds: float | None) -> float | None:
+    """Convert seconds to rounded milliseconds."""
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+class CommandStats:
+    """Counters and rolling timings of one entry's executions.
+
+    Durations of the last ``STATS_WINDOW`` runs are kept to report the
+    median and 95th percentile without storing an unbounded history.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the statistics."""
+        self.runs = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.truncations = 0
+        self.last_returncode: int | None = None
+        self.last_duration: float | None = None
+        self.last_queue_wait: float | None = None
+        self.last_spawn_time: float | None = None
+        self.last_run_time: float | None = None
+        self.last_render_time: float | None = None
+        self.last_loop_time: float | None = None
+        self.max_loop_time = 0.0
+        self.last_stdout_size: int | None = None
+        self.last_stderr_size: int | None = None
+        self.durations: deque[float] = deque(maxlen=STATS_WINDOW)
+        self._listeners: list[Callable[[], None]] = []
+
+    @callback
+    def async_record(
+        self,
+        result: CommandResult | None,
+        duration: float,
+        render_time: float = 0.0,
+        loop_time: float = 0.0,
+    ) -> None:
+        """Record one update; ``result`` is None if the command did not run.
+
+        ``render_time`` is the total time spent processing the output and
+        ``loop_time`` the part of it that blocked the event loop.
+        """
+        self.runs += 1
+        self.last_duration = duration
+        self.last_render_time = render_time
+        self.last_loop_time = loop_time
+        self.max_loop_time = max(self.max_loop_time, loop_time)
+        self.durations.append(duration)
+
+        if result is None:
+            self.failures += 1
+            self.last_returncode = None
+        else:
+            if result.timed_out:
+                self.timeouts += 1
+            elif result.returncode != 0 and not result.truncated:
+                self.failures += 1
+            if result.truncated:
+                self.truncations += 1
+            self.last_returncode = result.returncode
+            self.last_queue_wait = result.queue_wait
+            self.last_spawn_time = result.spawn_time
+            self.last_run_time = result.run_time
+            self.last_stdout_size = result.stdout_size
+            self.last_stderr_size = result.stderr_size
+
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def percentile(self, percent: float) -> float | None:
+        """Return a percentile (nearest rank) of the recent durations."""
+        if not self.durations:
+            return None
+        ordered = sorted(self.durations)
+        index = max(0, round(percent / 100 * len(ordered)) - 1)
+        return ordered[min(index, len(ordered) - 1)]
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call ``update_callback`` after every recorded update."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics with times in milliseconds."""
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "truncations": self.truncations,
+            "last_returncode": self.last_returncode,
+            "last_duration_ms": _ms(self.last_duration),
+            "last_queue_wait_ms": _ms(self.last_queue_wait),
+            "last_spawn_ms": _ms(self.last_spawn_time),
+            "last_run_ms": _ms(self.last_run_time),
+            "last_render_ms": _ms(self.last_render_time),
+            "last_loop_ms": _ms(self.last_loop_time),
+            "max_loop_ms": _ms(self.max_loop_time),
+            "last_stdout_bytes": self.last_stdout_size,
+            "last_stderr_bytes": self.last_stderr_size,
+            "duration_p50_ms": _ms(self.percentile(50)),
+            "duration_p95_ms": _ms(self.percentile(95)),
+            "samples": len(self.durations),
+        }
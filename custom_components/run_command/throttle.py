@@ -0,0 +1,113 @@
+"""Significant-change filtering of state writes for Run Command integration."""
+from __future__ import annotations
+
+import math
+import time
+from collections.abc import Mapping
+from typing import Any
+
+from .const import DEADBAND_PERCENT
+
+
+def _as_number(value: Any) -> float | None:
+    """Return ``value`` as a finite float, or None if it is not numeric."""
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+class StateWriteFilter:
+    """Decide which rendered states of a sensor are worth writing.
+
+    A numeric state is significant when it moved by more than ``deadband``
+    from the last written state (or by more than ``deadband`` percent of it
+    with ``deadband_type`` set to percent). Any other change of the state or
+    of the recorded attributes is always significant. Significant changes
+    are still held back until ``min_interval`` seconds passed since the last
+    write, and ``pending_delay`` tells when a held-back change may be
+    written; after ``heartbeat`` seconds without a write the state is
+    written even if it did not change.
+    """
+
+    def __init__(
+        self,
+        deadband: float = 0,
+        deadband_type: str = "",
+        min_interval: float = 0,
+        heartbeat: float = 0,
+    ) -> None:
+        """Initialize the filter."""
+        self.deadband = deadband
+        self.percent = deadband_type == DEADBAND_PERCENT
+        self.min_interval = min_interval
+        self.heartbeat = heartbeat
+        self._state: Any = None
+        self._attributes: dict[str, Any] | None = None
+        self._written_at: float | None = None
+        self._pending = False
+
+    def __bool__(self) -> bool:
+        """Return True if any filtering is configured."""
+        return bool(self.deadband or self.min_interval or self.heartbeat)
+
+    def heartbeat_due(self, now: float | None = None) -> bool:
+        """Return True if the heartbeat interval passed since the last write."""
+        if not self.heartbeat or self._written_at is None:
+            return False
+        now = time.monotonic() if now is None else now
+        return now - self._written_at >= self.heartbeat
+
+    def pending_delay(self, now: float | None = None) -> float | None:
+        """Return the seconds until a held-back change may be written.
+
+        Returns None if no significant change is being held back.
+        """
+        if not self._pending or self._written_at is None:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._written_at + self.min_interval - now)
+
+    def _significant(self, state: Any, attributes: Mapping[str, Any]) -> bool:
+        """Return True if the state or attributes changed enough to write."""
+        if attributes != self._attributes:
+            return True
+        new, old = _as_number(state), _as_number(self._state)
+        if new is None or old is None:
+            return state != self._state
+        threshold = abs(old) * self.deadband / 100 if self.percent else self.deadband
+        return abs(new - old) > threshold
+
+    def should_write(
+        self,
+        state: Any,
+        attributes: Mapping[str, Any],
+        force: bool = False,
+        now: float | None = None,
+    ) -> bool:
+        """Return True if the state should be written now, and record it if so.
+
+        ``attributes`` must not contain the volatile attributes (such as
+        the update time) that change on every poll. A ``force``d write is
+        always let through.
+        """
+        now = time.monotonic() if now is None else now
+        if (
+            not force
+            and self._written_at is not None
+            and not self.heartbeat_due(now)
+        ):
+            if not self._significant(state, attributes):
+                self._pending = False
+                return False
+            if now - self._written_at < self.min_interval:
+                self._pending = True
+                return False
+        self._state = state
+        self._attributes = dict(attributes)
+        self._written_at = now
+        self._pending = False
+        return True
@@ -0,0 +1,13 @@
+"""Make the integration's Home Assistant-free modules importable in tests."""
+from __future__ import annotations
+
+import sys
+import types
+from pathlib import Path
+
+COMPONENT = Path(__file__).resolve().parent.parent / "custom_components" / "run_command"
+
+# 패키지 __init__은 Home Assistant를 가져오므로 건너뛰고 모듈만 불러옴
+package = types.ModuleType("run_command")
+package.__path__ = [str(COMPONENT)]
+sys.modules.setdefault("run_command", package)
@@ -0,0 +1,53 @@
+"""Tests for the poll backoff."""
+from __future__ import annotations
+
+import pytest
+
+from run_command import backoff
+from run_command.backoff import CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, PollBackoff
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Return a settable monotonic clock used by the backoff."""
+    now = [1000.0]
+    monkeypatch.setattr(backoff.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_failure_backoff(clock):
+    """Consecutive failures delay polls and triggered runs alike."""
+    poll = PollBackoff(10, threshold=3, max_delay=300, open_time=600)
+    poll.record(failed=True, changed=False)
+
+    assert not poll.allow()
+    assert not poll.allow(triggered=True)
+    assert poll.retry_in == 15
+
+    clock[0] += 15
+    assert poll.allow(triggered=True)
+
+
+def test_open_circuit(clock):
+    """An open circuit lets one probe through after the open time."""
+    poll = PollBackoff(10, threshold=2, max_delay=300, open_time=600)
+    poll.record(failed=True, changed=False)
+    poll.record(failed=True, changed=False)
+    assert poll.state == CIRCUIT_OPEN
+
+    assert not poll.allow(triggered=True)
+    clock[0] += poll.retry_in
+    assert poll.allow(triggered=True)
+    assert poll.state == CIRCUIT_HALF_OPEN
+
+
+def test_adaptive_interval_skips_polls_only(clock):
+    """The adaptive interval holds back timer polls but not triggered runs."""
+    poll = PollBackoff(10, threshold=3, max_delay=300, open_time=600, adaptive=True)
+    poll.record(failed=False, changed=True)
+
+    assert not poll.allow()
+    assert poll.allow(triggered=True)
+
+    clock[0] += 5
+    assert poll.allow()
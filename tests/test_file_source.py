@@ -0,0 +1,91 @@
+"""Tests for the file source reader."""
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from run_command.file_source import FileReader
+
+
+@pytest.fixture
+def reader():
+    """Return a file reader that is closed after the test."""
+    reader = FileReader()
+    yield reader
+    reader.close()
+
+
+def test_read_in_order(tmp_path, reader):
+    """Files are concatenated like cat."""
+    (tmp_path / "a").write_bytes(b"first\n")
+    (tmp_path / "b").write_bytes(b"second\n")
+
+    result = reader.read([str(tmp_path / "a"), str(tmp_path / "b")], 1024)
+
+    assert result.stdout == b"first\nsecond\n"
+    assert result.returncode == 0
+    assert result.stdout_size == 13
+
+
+def test_in_place_write(tmp_path, reader):
+    """A file rewritten in place is read through the cached descriptor."""
+    path = tmp_path / "value"
+    path.write_bytes(b"1\n")
+    assert reader.read([str(path)], 1024).stdout == b"1\n"
+
+    path.write_bytes(b"22\n")
+
+    assert reader.read([str(path)], 1024).stdout == b"22\n"
+
+
+def test_rename_then_recreate(tmp_path, reader):
+    """A rotated file is reopened instead of reading the renamed one."""
+    path = tmp_path / "app.log"
+    path.write_bytes(b"old\n")
+    assert reader.read([str(path)], 1024).stdout == b"old\n"
+
+    os.replace(path, tmp_path / "app.log.1")
+    path.write_bytes(b"new\n")
+
+    assert reader.read([str(path)], 1024).stdout == b"new\n"
+
+
+def test_replaced_by_rename(tmp_path, reader):
+    """A file atomically replaced by another is reopened."""
+    path = tmp_path / "state"
+    path.write_bytes(b"old\n")
+    assert reader.read([str(path)], 1024).stdout == b"old\n"
+
+    (tmp_path / "state.tmp").write_bytes(b"new\n")
+    os.replace(tmp_path / "state.tmp", path)
+
+    assert reader.read([str(path)], 1024).stdout == b"new\n"
+
+
+def test_missing_file(tmp_path, reader):
+    """A missing file is reported on stderr like cat."""
+    path = tmp_path / "value"
+    path.write_bytes(b"1\n")
+    assert reader.read([str(path)], 1024).returncode == 0
+
+    path.unlink()
+    result = reader.read([str(path), str(tmp_path / "other")], 1024)
+
+    assert result.stdout == b""
+    assert result.returncode == 1
+    assert result.stderr.decode().splitlines() == [
+        f"{path}: No such file or directory",
+        f"{tmp_path / 'other'}: No such file or directory",
+    ]
+
+
+def test_output_limit(tmp_path, reader):
+    """Output past the limit is not returned but is counted."""
+    path = tmp_path / "big"
+    path.write_bytes(b"x" * 100)
+
+    result = reader.read([str(path)], 10)
+
+    assert result.stdout == b"x" * 10
+    assert result.stdout_size == 11
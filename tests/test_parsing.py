@@ -0,0 +1,48 @@
+"""Tests for command output parsing."""
+from __future__ import annotations
+
+import json
+import math
+
+import pytest
+
+from run_command.parsing import parse_json
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"status": "ok", "count": 3}',
+        "[1, 2.5, null]",
+        '"ok"',
+        "42",
+        "-1.5",
+        "true",
+        "false",
+        "null",
+        '{"id": 123456789012345678901234567890}',
+        "-9223372036854775809",
+    ],
+)
+def test_parse_json_matches_json_loads(text: str) -> None:
+    """Valid JSON parses to the same value as json.loads."""
+    assert parse_json(text) == json.loads(text)
+
+
+def test_parse_json_top_level_string() -> None:
+    """Output that is a JSON string (e.g. from jq .status) is decoded."""
+    assert parse_json('"ok"') == "ok"
+
+
+@pytest.mark.parametrize("text", ["NaN", "Infinity", "-Infinity", "1e400"])
+def test_parse_json_non_finite(text: str) -> None:
+    """Non-finite numbers accepted by json.loads are kept."""
+    value = parse_json(text)
+    assert isinstance(value, float)
+    assert math.isnan(value) or math.isinf(value)
+
+
+@pytest.mark.parametrize("text", ["", "ok", "12 34", "true story", "{broken"])
+def test_parse_json_not_json(text: str) -> None:
+    """Output that is not JSON gives None."""
+    assert parse_json(text) is None
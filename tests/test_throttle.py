@@ -0,0 +1,76 @@
+"""Tests for state write filtering."""
+from __future__ import annotations
+
+from run_command.const import DEADBAND_PERCENT
+from run_command.throttle import StateWriteFilter
+
+
+def test_deadband():
+    """Numeric changes within the deadband are not written."""
+    write_filter = StateWriteFilter(deadband=0.5)
+    assert write_filter.should_write("10", {}, now=0)
+
+    assert not write_filter.should_write("10.4", {}, now=1)
+    assert write_filter.should_write("10.6", {}, now=2)
+
+
+def test_percent_deadband():
+    """A percent deadband is relative to the last written value."""
+    write_filter = StateWriteFilter(deadband=10, deadband_type=DEADBAND_PERCENT)
+    assert write_filter.should_write(200, {}, now=0)
+
+    assert not write_filter.should_write(215, {}, now=1)
+    assert write_filter.should_write(225, {}, now=2)
+
+
+def test_attribute_change_is_significant():
+    """A changed attribute is written even if the state did not move."""
+    write_filter = StateWriteFilter(deadband=5)
+    assert write_filter.should_write(1, {"a": 1}, now=0)
+
+    assert write_filter.should_write(1, {"a": 2}, now=1)
+
+
+def test_min_interval_holds_change_back():
+    """A change inside the minimum interval is pending until it expires."""
+    write_filter = StateWriteFilter(min_interval=30)
+    assert write_filter.should_write("on", {}, now=0)
+    assert write_filter.pending_delay(now=0) is None
+
+    assert not write_filter.should_write("off", {}, now=10)
+    assert write_filter.pending_delay(now=10) == 20
+
+    # 같은 출력이 반복되어도 보류된 변경은 간격이 지나면 기록됨
+    assert not write_filter.should_write("off", {}, now=20)
+    assert write_filter.pending_delay(now=20) == 10
+    assert write_filter.should_write("off", {}, now=30)
+    assert write_filter.pending_delay(now=30) is None
+
+
+def test_pending_change_reverted():
+    """A held-back change that reverts is no longer pending."""
+    write_filter = StateWriteFilter(min_interval=30)
+    assert write_filter.should_write("on", {}, now=0)
+    assert not write_filter.should_write("off", {}, now=10)
+
+    assert not write_filter.should_write("on", {}, now=15)
+    assert write_filter.pending_delay(now=15) is None
+
+
+def test_heartbeat():
+    """An unchanged state is written again after the heartbeat interval."""
+    write_filter = StateWriteFilter(min_interval=30, heartbeat=60)
+    assert write_filter.should_write("on", {}, now=0)
+
+    assert not write_filter.should_write("on", {}, now=59)
+    assert write_filter.heartbeat_due(now=60)
+    assert write_filter.should_write("on", {}, now=60)
+
+
+def test_force():
+    """A forced write bypasses the minimum interval."""
+    write_filter = StateWriteFilter(min_interval=30)
+    assert write_filter.should_write("on", {}, now=0)
+
+    assert write_filter.should_write("off", {}, force=True, now=1)
+    assert write_filter.pending_delay(now=1) is None